@@ -1,23 +1,79 @@
 from pydantic import BaseModel
-import datetime
 import asyncio
+import datetime
+import logging
 import aiohttp
 from fastapi import APIRouter, HTTPException, Depends, Path
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from typing import AsyncIterable, Literal, Optional, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-import requests
 import json
 
-from app.db.session import get_db
-from app.db.models import Campaign, RestaurantCustomer, Messages, Customer, Conversation  # Import Customer model
+from app.core.config import (
+    HTTP_CONNECT_TIMEOUT,
+    CAMPAIGN_WEBHOOK_URL,
+    CAMPAIGN_CONCURRENCY,
+    CAMPAIGN_LIMIT_PER_HOST,
+    CAMPAIGN_SEND_RATE,
+    CAMPAIGN_READ_TIMEOUT,
+    CAMPAIGN_MAX_RETRIES,
+    CAMPAIGN_RETRY_BACKOFF,
+    CAMPAIGN_RETRY_BACKOFF_MAX,
+    CAMPAIGN_JOB_LEASE,
+    CAMPAIGN_JOB_MAX_ATTEMPTS,
+    CAMPAIGN_WRITE_BATCH_SIZE,
+    CAMPAIGN_WRITE_INTERVAL,
+    CAMPAIGN_AUDIENCE_CHUNK_SIZE,
+    CAMPAIGN_MESSAGE_MODE
+)
+from app.db.session import get_db, SessionLocal
+from app.db.models import Campaign, CampaignJob, RestaurantCustomer
+from app.schemas.campaign import CampaignJobProgress
+from app.services.campaign_jobs import (
+    FAILED,
+    PENDING,
+    ClaimedJob,
+    LeaseLost,
+    QUEUED,
+    RUNNING,
+    SENT,
+    add_campaign_recipients,
+    claim_campaign_job,
+    count_recipients,
+    enqueue_campaign_job,
+    fail_campaign_job,
+    finish_campaign_job,
+    has_recipients,
+    heartbeat_campaign_job,
+    requeue_campaign_job,
+    resume_campaign_job,
+    retry_failed_recipients,
+    save_message_template,
+    TEMPLATE
+)
+from app.services.campaign_results import CampaignResultWriter
+from app.services.campaigns import find_existing_campaigns, iter_campaign_audience, iter_pending_recipients
+from app.services.fanout import FanOutStats, RetryableError, call_with_retries, fan_out
+from app.services.inventory_cache import bump_restaurant_version
+from app.services.threads import iterate_in_chunks, run_to_completion
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-async def get_promo_message(customer_name: str, session: aiohttp.ClientSession):
-    # Replace with your actual webhook URL
-    webhook_url = 'https://noam.app.n8n.cloud/webhook/6ac2c534-dfb0-4b96-9d75-2b9ba36fdbe8'
+# Sent as the customer's name when generating a campaign's template, replaced by each customer's name
+NAME_PLACEHOLDER = '[CUSTOMER_NAME]'
 
+
+async def get_promo_message(customer_name: str, session: aiohttp.ClientSession) -> str:
+    """Generate a customer's promotional message with the webhook
+
+    Raises:
+        RetryableError: On a 5xx response or a body without a message
+        aiohttp.ClientResponseError: On other error responses
+    """
     # Define the headers
     headers = {'Content-Type': 'application/json'}
 
@@ -28,91 +84,266 @@ async def get_promo_message(customer_name: str, session: aiohttp.ClientSession):
     }
 
     # Make an async POST request with the payload
-    async with session.get(webhook_url, headers=headers, json=payload) as response:
-        print(f"Response status for {customer_name}: {response.status}")
-        return await response.text()
+    async with session.get(CAMPAIGN_WEBHOOK_URL, headers=headers, json=payload) as response:
+        if response.status >= 500:
+            raise RetryableError(f"Webhook returned {response.status}")
+        response.raise_for_status()
+        body = await response.text()
 
+    try:
+        return json.loads(body)[0]['output']
+    except (ValueError, LookupError, TypeError):
+        # The generator occasionally answers with something else, a new attempt usually works
+        raise RetryableError(f"Unexpected webhook response: {body[:200]!r}")
 
-def get_customer_ids(db: Session, restaurant_id: str) -> List[str]:
-    """
-    Get all customer IDs from the database.
+
+def open_campaign_session() -> aiohttp.ClientSession:
+    """HTTP client for one campaign's webhook calls, with its own connection limits"""
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=CAMPAIGN_CONCURRENCY, limit_per_host=CAMPAIGN_LIMIT_PER_HOST),
+        timeout=aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=CAMPAIGN_READ_TIMEOUT),
+    )
+
+
+def count_customers(db: Session, restaurant_id: str) -> int:
+    return db.query(func.count(RestaurantCustomer.id)).filter(RestaurantCustomer.restaurant_id == restaurant_id).scalar()
+
+
+async def get_promo_template(session: aiohttp.ClientSession) -> Optional[str]:
+    """Generate a campaign's message once, addressed to NAME_PLACEHOLDER
+
+    Returns:
+        The template, or None if the generated message does not contain the
+        placeholder and can't be personalized
     """
-    # Assuming you have a Customer model and a customers table
-    customer_ids = db.query(RestaurantCustomer.customer_id).filter(
-        RestaurantCustomer.restaurant_id == restaurant_id).all()
+    template = await call_with_retries(
+        lambda: get_promo_message(NAME_PLACEHOLDER, session),
+        CAMPAIGN_MAX_RETRIES, CAMPAIGN_RETRY_BACKOFF, CAMPAIGN_RETRY_BACKOFF_MAX
+    )
+    if NAME_PLACEHOLDER not in template:
+        logger.warning(f"Generated template has no {NAME_PLACEHOLDER}, generating a message per customer")
+        return None
+    return template
 
-    return [customer_id[0] for customer_id in customer_ids]
 
+def personalize_message(template: str, customer_name: str) -> str:
+    return template.replace(NAME_PLACEHOLDER, customer_name)
 
-async def send_promo_message(customer_id: str, restaurant_id: str, campaign_id: str, session: aiohttp.ClientSession, db: Session):
-    """Send a promotional message to a single customer using async"""
-    try:
-        # Get customer info
-        customer = db.query(Customer).filter(Customer.id == customer_id).first()
-        if not customer:
-            print(f"Customer with id {customer_id} not found.")
-            return
 
+async def send_promo_message(recipient_id: str, attempts: int, customer_id: str, customer_name: str,
+                             session: aiohttp.ClientSession, writer: CampaignResultWriter, stats: FanOutStats,
+                             template: Optional[str] = None):
+    """Personalize or generate a promotional message for a single recipient and buffer it for storage
+
+    With a template no request is made. Otherwise the webhook call is retried
+    with jittered exponential backoff on timeouts, connection errors and 5xx
+    responses. Raises if the message could not be generated.
+    """
+    def count_retry():
+        stats.retries += 1
+
+    if template is not None:
+        message = personalize_message(template, customer_name)
+    else:
         # Get message from API asynchronously
-        customer_name = customer.name
-        print(f"Fetching promo message for {customer_name}...")
-        promo_message = await get_promo_message(customer_name, session)
-        promo_message_json = json.loads(promo_message)
-        message = promo_message_json[0]['output']
-        print(f"Retrieved promo message for {customer_name}")
-
-        # Create conversation
-        new_conversation = Conversation(
-            campaign_id=campaign_id,
-            customer_id=customer_id,
+        message = await call_with_retries(
+            lambda: get_promo_message(customer_name, session),
+            CAMPAIGN_MAX_RETRIES, CAMPAIGN_RETRY_BACKOFF, CAMPAIGN_RETRY_BACKOFF_MAX,
+            on_retry=count_retry
         )
-        db.add(new_conversation)
-        db.commit()
-        db.refresh(new_conversation)
 
-        # Add message
-        new_message = Messages(
-            conversation_id=new_conversation.id,
-            role="system",
-            message=message,
-        )
-        db.add(new_message)
-        db.commit()
+    # Stored with other customers' messages in one transaction
+    writer.add(recipient_id, attempts, customer_id, message)
+    await writer.write_due()
+
+
+async def send_messages_to_all_customers(recipients: AsyncIterable[Tuple[str, int, str, str]], campaign_id: str, db: Session,
+                                         template: Optional[str] = None):
+    """Send promotional messages to all recipients, at most CAMPAIGN_CONCURRENCY at a time
+
+    Each recipient is marked sent with its stored message, or failed once its
+    retries are exhausted, unless another worker already did.
+
+    Args:
+        recipients: (recipient id, send attempts, customer id, customer name) of each recipient, read as the sends
+            progress
+        campaign_id: Campaign the messages belong to
+        db: Session the messages are stored with
+        template: Message to personalize for every customer, None to generate each one
+    """
+    stats = FanOutStats()
+    writer = CampaignResultWriter(db, campaign_id, CAMPAIGN_WRITE_BATCH_SIZE, CAMPAIGN_WRITE_INTERVAL)
+    async with open_campaign_session() as session:
+        async def send(recipient: Tuple[str, int, str, str]):
+            recipient_id, attempts, customer_id, customer_name = recipient
+            try:
+                await send_promo_message(recipient_id, attempts, customer_id, customer_name, session, writer, stats,
+                                         template)
+            except Exception as e:
+                writer.fail(recipient_id, attempts, repr(e))
+                await writer.write_due()
+                raise
+
+        try:
+            await fan_out(recipients, send, CAMPAIGN_CONCURRENCY, rate=CAMPAIGN_SEND_RATE, stats=stats)
+        finally:
+            # Keep what was generated, also when the sends are cancelled
+            await writer.write_all()
+
+    # Messages generated but not stored count as failed
+    failed = stats.failed + writer.failed
+    p99 = stats.latency_percentile(99)
+    logger.info(f"Campaign {campaign_id}: {writer.written} sent, {failed} failed, {stats.retries} retries "
+                f"in {stats.elapsed:.1f} s ({stats.per_second:.1f} messages/s, p99 send {p99 * 1e3:.0f} ms, "
+                f"{writer.write_seconds:.1f} s writing)")
+    # Return summary of results
+    return {
+        "total": stats.total,
+        "success": writer.written,
+        "failed": failed,
+        "retries": stats.retries,
+        "elapsed_seconds": round(stats.elapsed, 3),
+        "messages_per_second": round(stats.per_second, 2),
+        "p50_send_seconds": round(stats.latency_percentile(50), 4),
+        "p99_send_seconds": round(p99, 4),
+        "write_seconds": round(writer.write_seconds, 3)
+    }
+
+
+def record_recipients(db: Session, audience_db: Session, job: ClaimedJob):
+    """Record the restaurant's customers as the job's recipients, unless its first run already did"""
+    if has_recipients(db, job.campaign_id):
+        return
+    audience = iter_campaign_audience(audience_db, job.restaurant_id, job.campaign_id, CAMPAIGN_AUDIENCE_CHUNK_SIZE)
+    add_campaign_recipients(db, job, audience, CAMPAIGN_WRITE_BATCH_SIZE)
+    # End the read, so the pending recipients are read in a transaction that sees them
+    audience_db.rollback()
+
+
+async def send_campaign_job(db: Session, job: ClaimedJob):
+    """Send a claimed job's campaign to its pending recipients
+
+    The restaurant's customers are recorded as the job's recipients on its
+    first run. Recipients already sent or failed are skipped, so a job resumed
+    after a restart only sends what is left. The audience is streamed with its
+    own session, as db is committed while the sends progress. All database
+    work runs in the threadpool, off the event loop serving the API.
+    """
+    audience_db = SessionLocal()
+    try:
+        await run_to_completion(record_recipients, db, audience_db, job)
+
+        # Generated once per campaign and kept with the job, so a resumed job sends the same message
+        if job.message_mode == TEMPLATE and job.message_template is None:
+            async with open_campaign_session() as session:
+                template = await get_promo_template(session)
+            await run_to_completion(save_message_template, db, job, template)
+        template = job.message_template if job.message_mode == TEMPLATE else None
+
+        pending = (await run_to_completion(count_recipients, db, job.campaign_id)).get(PENDING, 0)
+        logger.info(f"Sending {pending} messages for campaign {job.campaign_id}, {CAMPAIGN_CONCURRENCY} at a time")
+
+        rows = iter_pending_recipients(audience_db, job.campaign_id, CAMPAIGN_AUDIENCE_CHUNK_SIZE)
+        recipients = iterate_in_chunks(rows, CAMPAIGN_AUDIENCE_CHUNK_SIZE)
+        return await send_messages_to_all_customers(recipients, job.campaign_id, db, template)
+    finally:
+        await run_to_completion(audience_db.close)
 
-        print(f"✓ Message sent to {customer_name}")
-        return {"customer": customer_name, "status": "success"}
-    except Exception as e:
-        print(f"Error sending message to customer {customer_id}: {str(e)}")
-        return {"customer_id": customer_id, "status": "error", "error": str(e)}
-
-
-async def send_messages_to_all_customers(customer_ids: List[str], restaurant_id: str, campaign_id: str, db: Session):
-    """Send promotional messages to all customers in parallel using asyncio.gather"""
-    # Create a shared aiohttp session for all requests
-    async with aiohttp.ClientSession() as session:
-        # Create a list of tasks, one for each customer
-        tasks = []
-        for customer_id in customer_ids:
-            task = send_promo_message(customer_id, restaurant_id, campaign_id, session, db)
-            tasks.append(task)
-
-        # Execute all tasks concurrently and wait for all to complete
-        print(f"Sending {len(tasks)} messages in parallel...")
-        results = await asyncio.gather(*tasks)
-        print(f"All {len(results)} messages sent for campaign {campaign_id}")
-
-        # Return summary of results
-        success_count = sum(1 for r in results if r.get('status') == 'success')
-        return {
-            "total": len(results),
-            "success": success_count,
-            "failed": len(results) - success_count
-        }
+
+def send_heartbeat(job: ClaimedJob):
+    """Record the job's heartbeat with a session of its own, as the job's is busy with the sends"""
+    db = SessionLocal()
+    try:
+        heartbeat_campaign_job(db, job)
+    finally:
+        db.close()
+
+
+async def hold_campaign_lease(job: ClaimedJob):
+    """Send the job's heartbeat every quarter of CAMPAIGN_JOB_LEASE until cancelled
+
+    Runs apart from the sends, so slow webhook calls can't let the lease
+    expire. Errors writing a heartbeat are logged and the next one is tried;
+    only losing the job to another worker ends it.
+
+    Raises:
+        LeaseLost: Once the job is no longer held by this claim
+    """
+    while True:
+        await asyncio.sleep(CAMPAIGN_JOB_LEASE / 4)
+        try:
+            await run_in_threadpool(send_heartbeat, job)
+        except LeaseLost:
+            raise
+        except Exception as e:
+            logger.warning(f"Error sending the heartbeat of campaign job {job.id}: {e!r}")
+
+
+async def run_campaign_job(db: Session, job: ClaimedJob):
+    """Run a claimed job while holding its lease, then mark it done
+
+    The sends are stopped as soon as the lease is lost, so a job taken over by
+    another worker is never sent twice in parallel.
+
+    Raises:
+        LeaseLost: If the job was taken over by another worker
+    """
+    work = asyncio.ensure_future(send_campaign_job(db, job))
+    lease = asyncio.ensure_future(hold_campaign_lease(job))
+    try:
+        await asyncio.wait((work, lease), return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        lease.cancel()
+        if not work.done():
+            # The lease was lost, or this worker is shutting down
+            work.cancel()
+        # Let the sends store what they generated before the job is released
+        await asyncio.gather(work, lease, return_exceptions=True)
+    if not lease.cancelled() and lease.exception() is not None:
+        raise lease.exception()
+
+    results = work.result()
+    await run_to_completion(finish_campaign_job, db, job, results["failed"])
+    return results
+
+
+async def run_campaign_worker(poll_interval: float):
+    """Claim and run queued campaign jobs until cancelled
+
+    Its database work runs in the threadpool, so the workers don't hold up
+    the API's requests.
+    """
+    while True:
+        db = SessionLocal()
+        job = None
+        try:
+            job = await run_to_completion(claim_campaign_job, db, CAMPAIGN_JOB_LEASE)
+            if job is not None:
+                logger.info(f"Running job {job.id} for campaign {job.campaign_id} (attempt {job.attempts})")
+                await run_campaign_job(db, job)
+        except asyncio.CancelledError:
+            if job is not None:
+                # Shutting down, let the next worker pick the job up without waiting for the lease
+                await run_to_completion(requeue_campaign_job, db, job)
+            raise
+        except LeaseLost as e:
+            # Another worker runs the job now, leave it to that one
+            logger.warning(str(e))
+        except Exception as e:
+            logger.error(f"Error running campaign job: {e!r}")
+            if job is not None:
+                await run_to_completion(fail_campaign_job, db, job, repr(e), CAMPAIGN_JOB_MAX_ATTEMPTS)
+        finally:
+            await run_to_completion(db.close)
+        if job is None:
+            await asyncio.sleep(poll_interval)
 
 
 class CampaignCreate(BaseModel):
     name: str = None
     campaign_started_id: str = None
+    # "template" personalizes one generated message, "per_customer" generates each one
+    message_mode: Optional[Literal["template", "per_customer"]] = None
 
 
 @router.post("/{restaurant_id}")
@@ -122,7 +353,10 @@ async def start_campaign(
     db: Session = Depends(get_db)
 ):
     """
-    Create a new campaign and send promotional messages to all customers in parallel.
+    Create a new campaign and queue promotional messages to all customers.
+
+    The messages are sent by the campaign workers; the returned job_id can be
+    used to follow their progress at /campaign/jobs/{job_id}.
     """
 
     # Add new element to the campaign table of the db
@@ -134,11 +368,10 @@ async def start_campaign(
     
     # If a campaign_started_id is provided, check if a campaign with this ID already exists
     if new_campaign.campaign_started_id:
-        existing_campaign = db.query(Campaign).filter(
-            Campaign.restaurant_id == restaurant_id,
-            Campaign.campaign_started_id == new_campaign.campaign_started_id
-        ).first()
-        
+        existing_campaign = find_existing_campaigns(
+            db, restaurant_id, [new_campaign.campaign_started_id]
+        ).get(new_campaign.campaign_started_id)
+
         if existing_campaign and existing_campaign.id != new_campaign.id:
             return {
                 "id": existing_campaign.id,
@@ -148,29 +381,102 @@ async def start_campaign(
             }
 
     db.add(new_campaign)
+    db.flush()
+    total = count_customers(db, restaurant_id)
+    # Queued in the same transaction, so a campaign can't exist without its sends
+    message_mode = campaign_data.message_mode if campaign_data and campaign_data.message_mode else CAMPAIGN_MESSAGE_MODE
+    job = enqueue_campaign_job(db, new_campaign.id, restaurant_id, total, message_mode) if total else None
+    bump_restaurant_version(db, restaurant_id)
     db.commit()
     db.refresh(new_campaign)
 
-    campaign_id = new_campaign.id
-    customer_ids = get_customer_ids(db, restaurant_id)
+    logger.info(f"Starting campaign '{new_campaign.name}' for {total} customers")
 
-    print(f"Starting campaign '{new_campaign.name}' for {len(customer_ids)} customers")
-
-    if not customer_ids:
+    if job is None:
         return {
-            "id": campaign_id,
+            "id": new_campaign.id,
             "name": new_campaign.name,
             "message": "Campaign created but no customers found to send messages to"
         }
 
-    # Send messages in parallel and wait for completion
-    results = await send_messages_to_all_customers(customer_ids, restaurant_id, campaign_id, db)
-
     return {
-        "id": campaign_id,
+        "id": new_campaign.id,
         "name": new_campaign.name,
-        "success_count": results['success'],
-        "failed_count": results['failed'],
-        "total_messages": results['total'],
-        "message": f"Campaign created and {results['success']} messages sent successfully"
+        "job_id": job.id,
+        "status": job.status,
+        "total_messages": total,
+        "message": f"Campaign created and {total} messages queued"
     }
+
+
+def get_job_or_404(db: Session, job_id: str) -> CampaignJob:
+    job = db.query(CampaignJob).filter(CampaignJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Campaign job not found")
+    return job
+
+
+def build_job_progress(db: Session, job: CampaignJob) -> CampaignJobProgress:
+    counts = count_recipients(db, job.campaign_id)
+    return CampaignJobProgress(
+        job_id=job.id,
+        campaign_id=job.campaign_id,
+        status=job.status,
+        message_mode=job.message_mode,
+        total=job.total,
+        sent=counts.get(SENT, 0),
+        failed=counts.get(FAILED, 0),
+        # Recipients are recorded when the job first runs
+        pending=counts.get(PENDING, 0) if counts else job.total,
+        attempts=job.attempts,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        updated_at=job.updated_at
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=CampaignJobProgress)
+async def get_campaign_job(
+    job_id: str = Path(..., description="The ID of the campaign job"),
+    db: Session = Depends(get_db)
+):
+    """Get the progress of a campaign's message sends"""
+    return build_job_progress(db, get_job_or_404(db, job_id))
+
+
+@router.post("/jobs/{job_id}/resume", response_model=CampaignJobProgress)
+async def resume_campaign(
+    job_id: str = Path(..., description="The ID of the campaign job"),
+    db: Session = Depends(get_db)
+):
+    """
+    Queue a finished or failed campaign job again to send to its pending recipients.
+
+    Recipients already sent or failed are left alone, use retry-failed to
+    send to the failed ones again.
+    """
+    job = get_job_or_404(db, job_id)
+    if job.status == RUNNING:
+        raise HTTPException(status_code=409, detail="Campaign job is running")
+    if job.status != QUEUED:
+        resume_campaign_job(job)
+        db.commit()
+    return build_job_progress(db, job)
+
+
+@router.post("/jobs/{job_id}/retry-failed", response_model=CampaignJobProgress)
+async def retry_failed_campaign_recipients(
+    job_id: str = Path(..., description="The ID of the campaign job"),
+    db: Session = Depends(get_db)
+):
+    """Make a campaign job's failed recipients pending again and queue the job to send to them"""
+    job = get_job_or_404(db, job_id)
+    if job.status == RUNNING:
+        # Its recipients were already read, the retried ones would only be sent on the next run
+        raise HTTPException(status_code=409, detail="Campaign job is running")
+    retried = retry_failed_recipients(db, job.campaign_id)
+    if retried and job.status != QUEUED:
+        resume_campaign_job(job)
+    db.commit()
+    logger.info(f"Retrying {retried} failed recipients of campaign {job.campaign_id}")
+    return build_job_progress(db, job)
@@ -1,142 +1,104 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+import asyncio
+import logging
+import warnings
+from fastapi import APIRouter, HTTPException, Depends, Query, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from typing import TYPE_CHECKING, Dict, List, Literal, Optional, Tuple
 from datetime import date, timedelta
-from app.schemas.forecast import ForecastResponse, ForecastItem
-import pandas as pd
+from sqlalchemy.orm import Session
+from app.schemas.forecast import (
+    ForecastResponse,
+    ForecastItem,
+    ForecastColumnarResponse,
+    ModelStatus,
+    ModelStatusResponse,
+    BatchForecastRequest,
+    BatchForecastResponse,
+    RestaurantForecast
+)
+from app.core.config import FORECAST_LATITUDE, FORECAST_LONGITUDE, FORECAST_MAX_AGE
+from app.db.session import get_db, SessionLocal
+from app.services.forecast_store import load_forecast, save_forecast
+from app.services.model_registry import model_registry, FOOD_ITEMS
+from app.services.weather import weather_provider
+from app.services.features import FeatureSchema, WeatherFeatures, get_feature_schema
 import numpy as np
-import pickle
-import requests
-import json
-import sklearn
 
-# Step 2: Fetch weather data from Open-Meteo API
+if TYPE_CHECKING:
+    # pandas is imported on first use, see warm_up_forecast
+    import pandas as pd
 
+logger = logging.getLogger(__name__)
 
-def fetch_weather_data():
-    """Fetch weather data from Open-Meteo API"""
+COLUMNAR_MEDIA_TYPE = "application/vnd.futureproof.forecast.columnar+json"
 
-    url = "https://api.open-meteo.com/v1/forecast?latitude=52.52&longitude=13.41&daily=sunshine_duration,rain_sum,snowfall_sum,temperature_2m_mean&hourly=temperature_2m"
+# Step 2: Fetch weather data from Open-Meteo API
 
-    try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.json()
-        else:
-            print(f"Error fetching data: {response.status_code}")
-            return None
-    except Exception as e:
-        print(f"Exception occurred: {e}")
+
+async def fetch_weather_data(latitude=FORECAST_LATITUDE, longitude=FORECAST_LONGITUDE):
+    """Fetch weather data from Open-Meteo API"""
+    snapshot = await weather_provider.get(latitude, longitude)
+    if snapshot is None:
+        print("Error fetching data: no weather data available")
         return None
+    return snapshot.data
 
 # Step 3: Process the weather data
 
 
-def process_weather_data(data):
+def process_weather_data(data, schema: Optional[FeatureSchema] = None) -> Optional[WeatherFeatures]:
     """Process the weather data to the format needed for predictions"""
     if not data:
         print("No weather data to process")
         return None
 
-    # Extract daily data
-    daily_data = pd.DataFrame()
-    daily_data['Date'] = pd.to_datetime(data['daily']['time'])
-    daily_data['temperature_2m_mean'] = data['daily']['temperature_2m_mean']
-    daily_data['sunshine_duration'] = data['daily']['sunshine_duration']
-    daily_data['rain_sum'] = data['daily']['rain_sum']
-    daily_data['snowfall_sum'] = data['daily']['snowfall_sum']
-
-    # Extract month and day features
-    daily_data['month'] = daily_data['Date'].dt.month
-    daily_data['day_of_week'] = daily_data['Date'].dt.dayofweek
-    daily_data['day_of_month'] = daily_data['Date'].dt.day
-
-    # Since we don't have weather_description, we'll approximate it based on temperature and precipitation
-    # This is a simplification and might need adjustment based on your model's training data
-    conditions = [
-        (daily_data['rain_sum'] > 5.0),
-        (daily_data['rain_sum'] > 0.0) & (daily_data['rain_sum'] <= 5.0),
-        (daily_data['snowfall_sum'] > 0.0),
-        (daily_data['temperature_2m_mean'] < 0),
-        (daily_data['sunshine_duration'] > 30000),
-        (daily_data['sunshine_duration'] > 10000) & (daily_data['sunshine_duration'] <= 30000)
-    ]
-
-    choices = ['Rain', 'Light Drizzle', 'Snow', 'Light Snow', 'Sunny', 'Mainly Sunny']
-    daily_data['weather_description'] = np.select(conditions, choices, default='Cloudy')
-
-    # One-hot encode weather_description
-    daily_data_encoded = pd.get_dummies(daily_data, columns=['weather_description'], drop_first=False)
-
-    return daily_data_encoded
+    if schema is None:
+        schema = get_feature_schema(model_registry.get_predictors())
+    return schema.build(data)
 
 # Step 4: Make predictions
 
 
-def predict_sales(processed_data):
+def predict_sales(features: Optional[WeatherFeatures], models=None):
     """Make sales predictions based on weather data"""
 
-    food_items = ['burger_sales', 'salad_sales', 'pizza_sales', 'ice_cream_sales']
-    models = {}
+    food_items = FOOD_ITEMS
+    if models is None:
+        models = model_registry.get_predictors()
 
-    for item in food_items:
-        model_filename = f'app/api/api_v1/endpoints/models/{item}_gradientboosting_model.pkl'
-        try:
-            with open(model_filename, 'rb') as f:
-                models[item] = pickle.load(f)
-            # print(f"Loaded model for {item}")
-        except FileNotFoundError:
-            print(f"Warning: Model file {model_filename} not found")
-
-    if processed_data is None or not models:
+    if features is None or not models:
         print("Cannot make predictions: missing data or models")
         return None
 
-    # Select only the features needed for prediction
-    required_features = set()
-    for item in food_items:
-        if item in models:
-            required_features.update(models[item].feature_names_in_)
-
-    # Check if all required features are present
-    missing_features = required_features - set(processed_data.columns)
-    if missing_features:
-        # print(f"Warning: Missing features: {missing_features}")
-        # Add missing features with default values (0)
-        for feature in missing_features:
-            processed_data[feature] = 0
-
-    # Make predictions for each food item
-    predictions = {}
-    for item, model in models.items():
-        # Make sure the features are in the right order
-        pred_data = processed_data[model.feature_names_in_]
-        predictions[item] = model.predict(pred_data)
+    import pandas as pd
 
     # Add predictions to the data
-    result_df = processed_data[['Date']].copy()
+    result_df = pd.DataFrame({'Date': pd.to_datetime(features.dates)})
     for item in food_items:
         if item in models:
-            result_df[item] = predictions[item]
+            # Select the model's features in the order it was trained with
+            columns = features.schema.columns_for(models[item])
+            with warnings.catch_warnings():
+                # Fitted on DataFrames but predicted on plain arrays laid out by the schema
+                warnings.filterwarnings("ignore", message="X does not have valid feature names", category=UserWarning)
+                result_df[item] = models[item].predict(features.X[:, columns])
 
     return result_df
 
 # Main function to run everything
 
 
-def make_prediction_df():
-
-    # Use the weather data from the API
-    weather_data = fetch_weather_data()
+def make_prediction_df_from_weather(weather_data):
+    """Run the CPU-bound part of the forecast: feature processing and model inference"""
+    models = model_registry.get_predictors()
 
     # Process the weather data
-    processed_data = process_weather_data(weather_data)
+    processed_data = process_weather_data(weather_data, get_feature_schema(models))
 
     if processed_data is not None:
-        # print("\nProcessed Weather Data:")
-        # print(processed_data[['Date', 'temperature_2m_mean', 'sunshine_duration', 'rain_sum', 'snowfall_sum']].head())
-
         # Make predictions
-        predictions_df = predict_sales(processed_data)
+        predictions_df = predict_sales(processed_data, models)
     else:
         print("No processed data to make predictions")
         return None
@@ -144,30 +106,257 @@ def make_prediction_df():
     return predictions_df
 
 
-router = APIRouter()
+def warm_up_forecast():
+    """Load the models and run one prediction so the first request does not pay for it
+
+    pandas and sklearn are only imported on first use; calling this at startup
+    moves that cost, and the first predict calls, out of the request path.
+    """
+    models = model_registry.get_predictors()
+    if not models:
+        return
+    schema = get_feature_schema(models)
+    features = WeatherFeatures(
+        dates=np.array([date.today()], dtype='datetime64[D]'),
+        X=np.zeros((1, len(schema.feature_names))),
+        schema=schema
+    )
+    predict_sales(features, models)
+
+
+async def refresh_forecast_table() -> Optional["pd.DataFrame"]:
+    """Compute the forecast and store it in the forecast table
+
+    Returns:
+        The predictions, also if they could not be stored, or None if none could be made
+    """
+    snapshot = await weather_provider.get(FORECAST_LATITUDE, FORECAST_LONGITUDE)
+    if snapshot is None:
+        logger.warning("Forecast refresh skipped: no weather data available")
+        return None
 
+    model_version = model_registry.version
+    predictions_df = await run_in_threadpool(make_prediction_df_from_weather, snapshot.data)
+    if predictions_df is None or predictions_df.empty:
+        logger.warning("Forecast refresh skipped: no predictions")
+        return None
+
+    db = SessionLocal()
+    try:
+        await run_in_threadpool(
+            save_forecast, db, predictions_df, FOOD_ITEMS, model_version, snapshot.snapshot_id
+        )
+    except Exception as e:
+        logger.error(f"Error storing forecast table: {e}")
+        return predictions_df
+    finally:
+        db.close()
+    logger.info(f"Forecast table refreshed (models {model_version}, weather {snapshot.snapshot_id})")
+    return predictions_df
 
-@router.get("/", response_model=ForecastResponse)
-async def get_forecast():
-    """Get forecast for the next X days"""
-    results = make_prediction_df()
-    if results is None:
-        raise HTTPException(status_code=500, detail="Error processing forecast data")
-    if results.empty:
-        raise HTTPException(status_code=404, detail="No forecast data available")
 
+_refresh: Optional[asyncio.Task] = None
+
+
+async def refresh_forecast_table_once() -> Optional["pd.DataFrame"]:
+    """Like refresh_forecast_table, but requests arriving while it runs share its result"""
+    global _refresh
+    if _refresh is None or _refresh.done() or _refresh.get_loop() is not asyncio.get_running_loop():
+        _refresh = asyncio.ensure_future(refresh_forecast_table())
+    # Shielded, so a request going away doesn't cancel the refresh the others wait for
+    return await asyncio.shield(_refresh)
+
+
+async def run_forecast_scheduler(interval: float):
+    """Refresh the forecast table every `interval` seconds until cancelled"""
+    while True:
+        try:
+            await refresh_forecast_table()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error refreshing forecast table: {e}")
+        await asyncio.sleep(interval)
+
+
+async def get_forecast_df(db: Session) -> Optional["pd.DataFrame"]:
+    """Get the forecast from the forecast table, refreshing it if the table is stale
+
+    The refresh is stored, so the requests that follow read the table again
+    instead of each computing the forecast live.
+    """
+    try:
+        # A query and a DataFrame build, kept off the event loop
+        predictions_df = await run_in_threadpool(
+            load_forecast, db, FOOD_ITEMS, model_registry.version, FORECAST_MAX_AGE
+        )
+    except Exception as e:
+        logger.error(f"Error reading forecast table: {e}")
+        db.rollback()
+        predictions_df = None
+
+    if predictions_df is not None:
+        return predictions_df
+    return await refresh_forecast_table_once()
+
+
+def make_batch_prediction_dfs_from_weather(weather_by_location: Dict[Tuple[float, float], dict]) -> Dict[Tuple[float, float], "pd.DataFrame"]:
+    """Make predictions for several locations with a single predict call per model
+
+    Args:
+        weather_by_location: Dictionary mapping (latitude, longitude) to Open-Meteo weather data
+
+    Returns:
+        Dictionary mapping each location with usable weather data to its prediction DataFrame
+    """
+    models = model_registry.get_predictors()
+    schema = get_feature_schema(models)
+
+    locations = []
+    features = []
+    for location, weather_data in weather_by_location.items():
+        processed_data = process_weather_data(weather_data, schema)
+        if processed_data is not None:
+            locations.append(location)
+            features.append(processed_data)
+
+    if not features:
+        return {}
+
+    # Stack all locations into one feature matrix; every location shares the schema's layout
+    stacked = WeatherFeatures(
+        dates=np.concatenate([f.dates for f in features]),
+        X=np.vstack([f.X for f in features]),
+        schema=schema
+    )
+    predictions_df = predict_sales(stacked, models)
+    if predictions_df is None:
+        return {}
+
+    results = {}
+    offset = 0
+    for location, location_features in zip(locations, features):
+        n_rows = len(location_features.dates)
+        results[location] = predictions_df.iloc[offset:offset + n_rows].reset_index(drop=True)
+        offset += n_rows
+    return results
+
+
+def build_forecast_items(results: "pd.DataFrame", food_items: List[str] = FOOD_ITEMS) -> List[ForecastItem]:
+    """Convert a prediction DataFrame into one ForecastItem per date and food item"""
     forecast_items = []
-    food_items = ['burger_sales', 'salad_sales', 'pizza_sales', 'ice_cream_sales']
+    quantities = results[food_items].to_numpy()
     # Iterate over each row (date)
-    for _, row in results.iterrows():
-        for item in food_items:
+    for timestamp, row in zip(results["Date"], quantities):
+        for item, quantity in zip(food_items, row):
             forecast_items.append(
                 ForecastItem(
-                    date=row["Date"].date(),
-                    item_id=hash(f"{row['Date']}_{item}"),
+                    date=timestamp.date(),
+                    item_id=hash(f"{timestamp}_{item}"),
                     item_name=item,
-                    predicted_quantity=row[item]
+                    predicted_quantity=quantity
                 )
             )
+    return forecast_items
+
+
+def build_columnar_forecast(results: "pd.DataFrame", food_items: List[str] = FOOD_ITEMS) -> dict:
+    """Convert a prediction DataFrame into the columnar forecast format
+
+    Returns:
+        Dictionary with the dates, the food items and one row of predicted
+        quantities per food item, aligned with the dates
+    """
+    return {
+        "dates": [timestamp.date().isoformat() for timestamp in results["Date"]],
+        "items": list(food_items),
+        "values": results[food_items].to_numpy().T.tolist(),
+    }
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=ForecastResponse,
+    responses={200: {"content": {COLUMNAR_MEDIA_TYPE: {"schema": ForecastColumnarResponse.model_json_schema()}}}}
+)
+async def get_forecast(
+    response_format: Optional[Literal["items", "columnar"]] = Query(
+        None, alias="format", description="'columnar' for dates[], items[] and values[][] instead of one object per item"
+    ),
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get forecast for the next X days
+
+    The columnar format is returned for `?format=columnar` or an Accept header
+    of `application/vnd.futureproof.forecast.columnar+json`. It is built straight
+    from the prediction arrays, without a Pydantic object per date and item.
+    """
+    results = await get_forecast_df(db)
+    if results is None:
+        raise HTTPException(status_code=500, detail="Error processing forecast data")
+    if results.empty:
+        raise HTTPException(status_code=404, detail="No forecast data available")
+
+    if response_format is None and accept and COLUMNAR_MEDIA_TYPE in accept:
+        response_format = "columnar"
+    if response_format == "columnar":
+        return JSONResponse(build_columnar_forecast(results), media_type=COLUMNAR_MEDIA_TYPE)
+
+    return ForecastResponse(items=build_forecast_items(results))
+
+
+@router.post("/batch", response_model=BatchForecastResponse)
+async def get_batch_forecast(request: BatchForecastRequest):
+    """Get forecasts for many restaurants at once.
+
+    Weather is fetched once per distinct location and all locations are
+    predicted together, so each model runs a single predict call per request.
+    Restaurants without coordinates use the default forecast location.
+    """
+    restaurant_locations = [
+        (
+            restaurant.restaurant_id,
+            round(restaurant.latitude if restaurant.latitude is not None else FORECAST_LATITUDE, 4),
+            round(restaurant.longitude if restaurant.longitude is not None else FORECAST_LONGITUDE, 4)
+        )
+        for restaurant in request.restaurants
+    ]
+
+    # Fetch weather for every distinct location concurrently
+    locations = list(dict.fromkeys((latitude, longitude) for _, latitude, longitude in restaurant_locations))
+    weather = await asyncio.gather(*(fetch_weather_data(latitude, longitude) for latitude, longitude in locations))
+    weather_by_location = {
+        location: weather_data
+        for location, weather_data in zip(locations, weather)
+        if weather_data is not None
+    }
+
+    predictions = await run_in_threadpool(make_batch_prediction_dfs_from_weather, weather_by_location)
+
+    forecasts = []
+    for restaurant_id, latitude, longitude in restaurant_locations:
+        results = predictions.get((latitude, longitude))
+        forecasts.append(
+            RestaurantForecast(
+                restaurant_id=restaurant_id,
+                latitude=latitude,
+                longitude=longitude,
+                items=build_forecast_items(results) if results is not None else [],
+                error=None if results is not None else "No forecast data available"
+            )
+        )
+
+    return BatchForecastResponse(forecasts=forecasts)
+
 
-    return ForecastResponse(items=forecast_items)
+@router.get("/models", response_model=ModelStatusResponse)
+async def get_model_status():
+    """Get version and load time of the models used for forecasting"""
+    return ModelStatusResponse(
+        version=model_registry.version,
+        models=[ModelStatus(**status) for status in model_registry.status()]
+    )
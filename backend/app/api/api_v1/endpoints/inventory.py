@@ -9,7 +9,8 @@ from app.schemas.inventory import (
     RestaurantInventoryResponse
 )
 from app.db.session import get_db
-from app.db.models import Restaurant, Inventory, Order, RestaurantOrder
+from app.db.models import Restaurant
+from app.services.inventory import get_inventory_with_orders
 
 router = APIRouter()
 
@@ -28,29 +29,12 @@ async def get_restaurant_inventory(
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    # Get all inventory items for this restaurant
-    inventory_items = db.query(Inventory).filter(Inventory.restaurant_id == restaurant_id).all()
-    
-    # Get all orders for this restaurant's inventory items
-    restaurant_orders = db.query(RestaurantOrder).filter(RestaurantOrder.restaurant_id == restaurant_id).all()
-    order_ids = [ro.order_id for ro in restaurant_orders]
-    
-    # Get order details for these orders
-    orders = []
-    if order_ids:
-        orders = db.query(Order).filter(Order.id.in_(order_ids)).all()
-    
-    # Create a dictionary of ordered items by inventory_id
-    order_by_inventory_id = {}
-    for order in orders:
-        if order.inventory_id in order_by_inventory_id:
-            order_by_inventory_id[order.inventory_id] += order.order_amount
-        else:
-            order_by_inventory_id[order.inventory_id] = order.order_amount
-    
+    # Get all inventory items for this restaurant with their ordered amounts
+    inventory_items = get_inventory_with_orders(db, restaurant_id)
+
     # Map inventory items to the response schema
     items = []
-    for item in inventory_items:
+    for item, ordered_amount in inventory_items:
 
         # Map categories based on item name (this is a simple example)
         category = "Other"
@@ -65,9 +49,6 @@ async def get_restaurant_inventory(
         elif any(sauce in item.item.lower() for sauce in ["sauce", "syrup"]):
             category = "Condiments"
 
-        # Get ordered amount for this inventory item (if any)
-        ordered_amount = order_by_inventory_id.get(item.id, 0)
-        
         # Create inventory item with additional frontend-friendly fields
         inventory_item = RestaurantInventoryItem(
             id=item.id,
@@ -1,215 +1,180 @@
-import json
-import os
 from fastapi import APIRouter, HTTPException, Depends, Path
-from typing import Dict, List, Any
+from fastapi.responses import StreamingResponse
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Set, Tuple
 from sqlalchemy.orm import Session
-import pandas as pd
 from datetime import datetime, timedelta
 
 from app.schemas.inventory_forecast import (
     InventoryForecastItem,
     InventoryForecastSummary,
     PromotionRecommendation,
-    InventoryForecastResponse
+    InventoryForecastResponse,
+    InventoryForecastCacheStats
 )
-from app.api.api_v1.endpoints.forecast import make_prediction_df
-from app.db.session import get_db
-from app.db.models import Restaurant, Inventory, Order, RestaurantOrder, Campaign
+from app.api.api_v1.endpoints.forecast import get_forecast_df
+from app.core.config import FORECAST_MAX_AGE, PROMOTION_SOLVER_TIME_LIMIT
+from app.db.session import get_db, SessionLocal
+from app.db.models import Restaurant
+from app.services.campaigns import find_existing_campaigns, find_existing_campaign_ids
+from app.services.inventory import get_inventories_with_orders, get_inventory_with_orders
+from app.services.inventory_cache import inventory_forecast_cache
+from app.services.forecast_store import stored_forecast_version
+from app.services.model_registry import FOOD_ITEMS, model_registry
+from app.services.promotion_solver import solve_promotion_mix
+from app.services.recipes import RecipeIndex, recipe_registry
+from app.services.requirements import compare_with_inventory, compute_requirements, stockout_timeline
+import numpy as np
 
-router = APIRouter()
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Load recipes data
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-RECIPES_PATH = os.path.join(BASE_DIR, "data", "recipes.json")
+router = APIRouter()
 
+EXCESS_THRESHOLD = 20  # Amount above required to be considered excess
+FLEET_CHUNK_SIZE = 200  # Restaurants loaded per batch of fleet queries
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
-def load_recipes():
-    """Load recipes from JSON file"""
-    try:
-        with open(RECIPES_PATH, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading recipes: {e}")
-        return {}
+# Map from menu_item_key to friendly name
+MENU_ITEM_NAMES = {
+    "burger_sales": "Burger",
+    "salad_sales": "Salad",
+    "pizza_sales": "Pizza",
+    "ice_cream_sales": "Ice Cream"
+}
 
 
-def calculate_required_ingredients(menu_items: Dict[str, int], recipes: Dict[str, Any]) -> Dict[str, Dict]:
-    """Calculate the required ingredients based on menu items and recipes
+def build_inventory_summary(
+    forecast_df: "pd.DataFrame",
+    recipe_index: RecipeIndex,
+    current_inventory: Dict[str, Dict[str, Any]],
+    menu_keys: List[str] = FOOD_ITEMS,
+    excess_threshold: float = EXCESS_THRESHOLD
+) -> InventoryForecastSummary:
+    """Compare inventory with the ingredients needed to serve a sales forecast
 
     Args:
-        menu_items: Dictionary mapping menu item names to quantities
-        recipes: Dictionary containing recipe information
+        forecast_df: Forecast with one column of predicted sales per menu item
+        recipe_index: Recipes of the menu items
+        current_inventory: Dictionary mapping ingredient names to their available
+            "amount" (in stock plus ordered), "unit" and "ordered" amount
+        menu_keys: Menu items to serve, in the order their ingredients are listed
+        excess_threshold: Amount above required to be considered excess
 
     Returns:
-        Dictionary mapping ingredient names to their required quantities and units
+        Summary with the shortages and the excesses of ingredients, each with
+        the amount left at the end of every forecast day and the first day it
+        runs out
     """
-    required_ingredients = {}
-
-    for menu_item, quantity in menu_items.items():
-        if menu_item not in recipes:
-            continue
-
-        for ingredient in recipes[menu_item]["ingredients"]:
-            item_name = ingredient["item"]
-            required_amount = ingredient["amount"] * quantity
-            unit = ingredient["unit"]
+    menu_keys = [item for item in menu_keys if item in forecast_df.columns]
+    requirements = compute_requirements(recipe_index, menu_keys, forecast_df[menu_keys].to_numpy())
 
-            if item_name not in required_ingredients:
-                required_ingredients[item_name] = {
-                    "amount": required_amount,
-                    "unit": unit,
-                    "menu_items": [recipes[menu_item]["name"]]
-                }
-            else:
-                required_ingredients[item_name]["amount"] += required_amount
-                if recipes[menu_item]["name"] not in required_ingredients[item_name]["menu_items"]:
-                    required_ingredients[item_name]["menu_items"].append(recipes[menu_item]["name"])
+    available = np.array([
+        current_inventory[item_name]["amount"] if item_name in current_inventory else 0
+        for item_name in requirements.ingredients
+    ])
+    difference, shortages, excesses = compare_with_inventory(requirements, available, excess_threshold)
 
-    return required_ingredients
+    # Only the reported ingredients are followed day by day
+    reported = np.concatenate([shortages, excesses])
+    balances, stockout_days = stockout_timeline(requirements, available, reported)
+    dates = [timestamp.date() for timestamp in forecast_df["Date"]]
+    # Converted once rather than per item, truncated like difference
+    daily_balances = dict(zip(reported.tolist(), balances.astype(np.int64).T.tolist()))
+    stockout_dates = {i: dates[day] for i, day in zip(reported.tolist(), stockout_days.tolist()) if day >= 0}
 
+    def forecast_item(i: int) -> InventoryForecastItem:
+        item_name = requirements.ingredients[i]
+        inventory = current_inventory.get(item_name, {})
+        return InventoryForecastItem(
+            item=item_name,
+            current_amount=inventory.get("amount", 0),
+            required_amount=int(requirements.amounts[i]),
+            difference=int(difference[i]),
+            unit=requirements.units[i],
+            menu_items=list(requirements.menu_names[i]),
+            ordered_amount=inventory.get("ordered", 0),  # Include ordered amount for display
+            stockout_date=stockout_dates.get(i),
+            daily_balances=daily_balances[i]
+        )
 
-@router.get("/restaurant/{restaurant_id}", response_model=InventoryForecastResponse)
-async def get_inventory_forecast(
-    restaurant_id: str = Path(..., description="The ID of the restaurant"),
-    db: Session = Depends(get_db)
-):
-    """Compare inventory with forecasted sales to determine shortages or excesses.
+    return InventoryForecastSummary(
+        shortages=[forecast_item(i) for i in shortages],
+        excesses=[forecast_item(i) for i in excesses]
+    )
 
-    This endpoint combines inventory data with sales forecasts to calculate what
-    ingredients are missing or in excess for the next 5 days of operations.
-    """
-    # Check if restaurant exists
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if not restaurant:
-        raise HTTPException(status_code=404, detail="Restaurant not found")
 
-    # Get all inventory items for this restaurant
-    inventory_items = db.query(Inventory).filter(Inventory.restaurant_id == restaurant_id).all()
-    
-    # Get all orders for this restaurant's inventory items
-    restaurant_orders = db.query(RestaurantOrder).filter(RestaurantOrder.restaurant_id == restaurant_id).all()
-    order_ids = [ro.order_id for ro in restaurant_orders]
-    
-    # Get order details for these orders
-    orders = []
-    if order_ids:
-        orders = db.query(Order).filter(Order.id.in_(order_ids)).all()
-    
-    # Create a dictionary of ordered items by inventory_id
-    order_by_inventory_id = {}
-    for order in orders:
-        if order.inventory_id in order_by_inventory_id:
-            order_by_inventory_id[order.inventory_id] += order.order_amount
-        else:
-            order_by_inventory_id[order.inventory_id] = order.order_amount
-    
-    # Convert inventory to dictionary for easy lookup
+def build_current_inventory(inventory_items: List[Tuple[Any, int]]) -> Dict[str, Dict[str, Any]]:
+    """Convert inventory items and their ordered amounts to a dictionary for easy lookup"""
     current_inventory = {}
-    for item in inventory_items:
-        # Check if there are orders for this inventory item
-        ordered_amount = order_by_inventory_id.get(item.id, 0)
-        
+    for item, ordered_amount in inventory_items:
         current_inventory[item.item] = {
             # Include both current inventory and ordered amount
             "amount": item.amount + ordered_amount,
             "unit": item.unit,
             "ordered": ordered_amount  # Track ordered amount separately for display
         }
+    return current_inventory
 
-    # Get forecast data
-    forecast_df = make_prediction_df()
-    if forecast_df is None or forecast_df.empty:
-        raise HTTPException(status_code=404, detail="No forecast data available")
 
-    # Load recipes
-    recipes = load_recipes()
-    if not recipes:
-        raise HTTPException(status_code=500, detail="Could not load recipes data")
+def promotion_campaign_started_id(menu_name: str, today: str) -> str:
+    """Unique campaign_started_id for a promotion of a menu item on a day"""
+    return f"{menu_name.lower().replace(' ', '_')}_{today}"
 
-    # Aggregate required ingredients across all forecast days
-    total_requirements = {}
-    menu_item_quantities = {}
-    
-    # Process each day in the forecast
-    for _, row in forecast_df.iterrows():
-        # Create a dictionary of menu items and their forecasted quantities
-        daily_menu_items = {
-            "burger_sales": round(row["burger_sales"]),
-            "salad_sales": round(row["salad_sales"]),
-            "pizza_sales": round(row["pizza_sales"]),
-            "ice_cream_sales": round(row["ice_cream_sales"])
-        }
-        
-        # Keep track of total menu item quantities for promotion recommendations
-        for item, qty in daily_menu_items.items():
-            menu_item_quantities[item] = menu_item_quantities.get(item, 0) + qty
-            
-        # Calculate required ingredients for this day
-        daily_required = calculate_required_ingredients(daily_menu_items, recipes)
-        
-        # Aggregate with existing requirements
-        for item_name, required in daily_required.items():
-            if item_name in total_requirements:
-                total_requirements[item_name]["amount"] += required["amount"]
-            else:
-                total_requirements[item_name] = required.copy()
-    
-    # Calculate shortages and excesses
-    shortage_items = []
-    excess_items = []
-    excess_threshold = 20  # Amount above required to be considered excess
-    
-    for item_name, required in total_requirements.items():
-        current_amount = 0
-        if item_name in current_inventory:
-            current_amount = current_inventory[item_name]["amount"]
-            
-        difference = current_amount - required["amount"]
-        
-        # Get ordered amount (if any)
-        ordered_amount = current_inventory[item_name].get("ordered", 0)
-        
-        # Create InventoryForecastItem
-        forecast_item = InventoryForecastItem(
-            item=item_name,
-            current_amount=current_amount,
-            required_amount=int(required["amount"]),
-            difference=int(difference),
-            unit=required["unit"],
-            menu_items=required["menu_items"],
-            ordered_amount=ordered_amount  # Include ordered amount for display
-        )
-        
-        # Add to appropriate list
-        if difference < 0:
-            shortage_items.append(forecast_item)
-        elif difference > excess_threshold:
-            excess_items.append(forecast_item)
-            
-    # Sort shortages by severity (most negative first)
-    shortage_items.sort(key=lambda x: x.difference)
-    # Sort excesses by amount (most excess first)
-    excess_items.sort(key=lambda x: -x.difference)
-    
-    # Generate promotion recommendations based on excess ingredients
+
+def promotion_campaign_started_ids(recipes: Dict[str, Any], today: str) -> List[str]:
+    """campaign_started_ids of every menu item that can be recommended for promotion on a day"""
+    return [
+        promotion_campaign_started_id(recipes[menu_key].get("name", friendly_name), today)
+        for menu_key, friendly_name in MENU_ITEM_NAMES.items()
+        if menu_key in recipes
+    ]
+
+
+def allocate_promotion_quantities(
+    recommendations: List[PromotionRecommendation],
+    menu_keys: List[str],
+    recipe_index: RecipeIndex,
+    excess_by_item: Dict[str, InventoryForecastItem]
+):
+    """Set the allocated_quantity of recommended menu items from one promotion mix
+
+    The items share the excess stock, so an ingredient's excess is only counted
+    once across all of them, unlike in each item's potential_quantity.
+    """
+    rows = [recipe_index.menu_index[menu_key] for menu_key in menu_keys]
+    columns = np.flatnonzero(recipe_index.uses[rows].any(axis=0))
+    excess = np.array([excess_by_item[recipe_index.ingredients[column]].difference for column in columns])
+    mix = solve_promotion_mix(
+        recipe_index.amounts[np.ix_(rows, columns)], excess, time_limit=PROMOTION_SOLVER_TIME_LIMIT
+    )
+    for recommendation, quantity in zip(recommendations, mix.quantities):
+        recommendation.allocated_quantity = int(quantity)
+
+
+def build_promotion_recommendations(
+    excess_items: List[InventoryForecastItem],
+    recipe_index: RecipeIndex,
+    existing_campaign_ids: Set[str],
+    today: str
+) -> List[PromotionRecommendation]:
+    """Recommend menu items whose ingredients are all in excess
+
+    Args:
+        excess_items: Ingredients in excess
+        recipe_index: Recipes of the menu items
+        existing_campaign_ids: campaign_started_ids the restaurant already started,
+            menu items with one of these for today are not recommended again
+        today: Date the campaign_started_ids are generated for, as YYYY-MM-DD
+    """
+    recipes = recipe_index.recipes
     promotion_recommendations = []
-    
-    # Map from menu_item_key to friendly name
-    menu_item_names = {
-        "burger_sales": "Burger",
-        "salad_sales": "Salad",
-        "pizza_sales": "Pizza",
-        "ice_cream_sales": "Ice Cream"
-    }
-    
+    recommended_menu_keys = []
+
     # Create a map of excess ingredients for quick lookup
-    excess_ingredient_set = {item.item for item in excess_items}
-    
-    # Map menu items to their excess ingredients
-    menu_item_excess_ingredients = {}
-    
+    excess_by_item = {item.item: item for item in excess_items}
+
     # Process each menu item to check if all its ingredients are in excess
-    for menu_key, friendly_name in menu_item_names.items():
+    for menu_key, friendly_name in MENU_ITEM_NAMES.items():
         if menu_key not in recipes:
             continue
             
@@ -229,18 +194,15 @@ async def get_inventory_forecast(
             ingredient_name = ingredient["item"]
             
             # If any ingredient is not in excess, this menu item can't be recommended
-            if ingredient_name not in excess_ingredient_set:
+            excess_item = excess_by_item.get(ingredient_name)
+            if excess_item is None:
                 all_in_excess = False
                 break
-                
-            # Find the corresponding excess item to get the exact amount
-            for excess_item in excess_items:
-                if excess_item.item == ingredient_name:
-                    excess_ingredients.append({
-                        "ingredient": ingredient_name,
-                        "excess": f"{excess_item.difference} {excess_item.unit}"
-                    })
-                    break
+
+            excess_ingredients.append({
+                "ingredient": ingredient_name,
+                "excess": f"{excess_item.difference} {excess_item.unit}"
+            })
         
         # Only add menu items where ALL ingredients are in excess
         if all_in_excess and excess_ingredients:
@@ -251,29 +213,18 @@ async def get_inventory_forecast(
                 ingredient_name = ingredient["item"]
                 required_amount = ingredient["amount"]
                 
-                # Find the excess item to calculate how many menu items could be made
-                for excess_item in excess_items:
-                    if excess_item.item == ingredient_name:
-                        # Calculate how many of this menu item we could make with this ingredient
-                        potential_qty = excess_item.difference // required_amount
-                        potential_quantities.append(potential_qty)
-                        break
+                # Calculate how many of this menu item we could make with this ingredient
+                potential_qty = excess_by_item[ingredient_name].difference // required_amount
+                potential_quantities.append(potential_qty)
             
             # The potential quantity is limited by the ingredient with the least excess
             potential_quantity = min(potential_quantities) if potential_quantities else 0
             
             # Generate a unique campaign_started_id based on menu_item and current date
-            today = datetime.now().strftime('%Y-%m-%d')
-            campaign_started_id = f"{menu_name.lower().replace(' ', '_')}_{today}"
-            
-            # Check if a campaign with this identifier already exists
-            existing_campaign = db.query(Campaign).filter(
-                Campaign.restaurant_id == restaurant_id,
-                Campaign.campaign_started_id == campaign_started_id
-            ).first()
-            
+            campaign_started_id = promotion_campaign_started_id(menu_name, today)
+
             # Only add the recommendation if no campaign with this ID exists
-            if not existing_campaign:
+            if campaign_started_id not in existing_campaign_ids:
                 recommendation = PromotionRecommendation(
                     menu_item=menu_name,
                     reason=f"Can make {potential_quantity} additional items",
@@ -282,20 +233,197 @@ async def get_inventory_forecast(
                     campaign_started_id=campaign_started_id  # Add the campaign_started_id to the recommendation
                 )
                 promotion_recommendations.append(recommendation)
-    
-    # Create the summary response
-    forecast_summary = InventoryForecastSummary(
-        shortages=shortage_items,
-        excesses=excess_items
+                recommended_menu_keys.append(menu_key)
+
+    if promotion_recommendations:
+        allocate_promotion_quantities(promotion_recommendations, recommended_menu_keys, recipe_index, excess_by_item)
+
+    return promotion_recommendations
+
+
+def build_inventory_forecast(
+    restaurant_id: str,
+    restaurant_name: str,
+    current_inventory: Dict[str, Dict[str, Any]],
+    forecast_df: "pd.DataFrame",
+    recipe_index: RecipeIndex,
+    existing_campaign_ids: Set[str],
+    today: str
+) -> InventoryForecastResponse:
+    """Build a restaurant's inventory forecast from data that is already loaded"""
+    # Calculate shortages and excesses
+    forecast_summary = build_inventory_summary(forecast_df, recipe_index, current_inventory)
+
+    # Generate promotion recommendations based on excess ingredients
+    promotion_recommendations = build_promotion_recommendations(
+        forecast_summary.excesses, recipe_index, existing_campaign_ids, today
     )
-    
+
     # Count how many unique menu items are available for promotion
     total_promotable_menu_items = len(promotion_recommendations)
-    
+
     return InventoryForecastResponse(
-        restaurant_id=restaurant.id,
-        restaurant_name=restaurant.name,
+        restaurant_id=restaurant_id,
+        restaurant_name=restaurant_name,
         forecast_summary=forecast_summary,
         promotion_recommendations=promotion_recommendations,
         promotable_menu_items_count=total_promotable_menu_items
     )
+
+
+def iter_fleet_inventory_forecasts(
+    db: Session,
+    forecast_df: "pd.DataFrame",
+    recipe_index: RecipeIndex,
+    chunk_size: int = FLEET_CHUNK_SIZE
+) -> Iterator[InventoryForecastResponse]:
+    """Yield the inventory forecast of every restaurant, ordered by restaurant id
+
+    Restaurants are read chunk_size at a time and each chunk's inventory, orders
+    and campaigns are loaded with one query each, so memory does not grow with
+    the number of restaurants.
+    """
+    today = datetime.now().strftime('%Y-%m-%d')
+    campaign_started_ids = promotion_campaign_started_ids(recipe_index.recipes, today)
+
+    last_id = None
+    while True:
+        query = db.query(Restaurant.id, Restaurant.name).order_by(Restaurant.id)
+        if last_id is not None:
+            query = query.filter(Restaurant.id > last_id)
+        restaurants = query.limit(chunk_size).all()
+        if not restaurants:
+            return
+
+        restaurant_ids = [restaurant.id for restaurant in restaurants]
+        inventories = get_inventories_with_orders(db, restaurant_ids)
+        existing_campaign_ids = find_existing_campaign_ids(db, restaurant_ids, campaign_started_ids)
+        # Nothing is written, don't keep the chunk's objects in the session
+        db.expunge_all()
+
+        for restaurant in restaurants:
+            yield build_inventory_forecast(
+                restaurant.id,
+                restaurant.name,
+                build_current_inventory(inventories.get(restaurant.id, [])),
+                forecast_df,
+                recipe_index,
+                existing_campaign_ids.get(restaurant.id, set()),
+                today
+            )
+        last_id = restaurant_ids[-1]
+
+
+def stream_fleet_inventory_forecasts(forecast_df: "pd.DataFrame", recipe_index: RecipeIndex,
+                                     chunk_size: int = FLEET_CHUNK_SIZE) -> Iterator[str]:
+    """Serialize the fleet's inventory forecasts as newline-delimited JSON
+
+    Uses its own session, as the response is streamed after the request's
+    session has been closed.
+    """
+    db = SessionLocal()
+    try:
+        for forecast in iter_fleet_inventory_forecasts(db, forecast_df, recipe_index, chunk_size):
+            yield forecast.model_dump_json() + "\n"
+    finally:
+        db.close()
+
+
+def get_recipe_index() -> RecipeIndex:
+    """Get the shared recipe index, reloaded only when recipes.json changes"""
+    recipe_index = recipe_registry.get()
+    if recipe_index is None or not recipe_index.recipes:
+        raise HTTPException(status_code=500, detail="Could not load recipes data")
+    return recipe_index
+
+
+async def load_forecast_df(db: Session) -> "pd.DataFrame":
+    """Get the sales forecast shared by all restaurants' inventory forecasts"""
+    forecast_df = await get_forecast_df(db)
+    if forecast_df is None or forecast_df.empty:
+        raise HTTPException(status_code=404, detail="No forecast data available")
+    return forecast_df
+
+
+async def load_inventory_forecast_inputs(db: Session) -> Tuple["pd.DataFrame", RecipeIndex]:
+    """Get the sales forecast and the recipes shared by all restaurants' inventory forecasts"""
+    forecast_df = await load_forecast_df(db)
+    return forecast_df, get_recipe_index()
+
+
+@router.get("/restaurant/{restaurant_id}", response_model=InventoryForecastResponse)
+async def get_inventory_forecast(
+    restaurant_id: str = Path(..., description="The ID of the restaurant"),
+    db: Session = Depends(get_db)
+):
+    """Compare inventory with forecasted sales to determine shortages or excesses.
+
+    This endpoint combines inventory data with sales forecasts to calculate what
+    ingredients are missing or in excess for the next 5 days of operations.
+    Results are cached per restaurant until its orders or campaigns change, or
+    the stored forecast, the recipes or the date do. A cached result costs the
+    restaurant's row and one row of the forecast table.
+    """
+    # Check if restaurant exists
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    if not restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    # The versions are read before the data, so a concurrent write can't be cached as current
+    today = datetime.now().strftime('%Y-%m-%d')
+    recipe_index = get_recipe_index()
+    forecast_version = stored_forecast_version(db, model_registry.version, FORECAST_MAX_AGE)
+    cache_key = (restaurant_id, restaurant.data_version, forecast_version, recipe_index.version, today)
+    if forecast_version is not None:
+        cached = inventory_forecast_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    forecast_df = await load_forecast_df(db)
+
+    # Get all inventory items for this restaurant with their ordered amounts
+    current_inventory = build_current_inventory(get_inventory_with_orders(db, restaurant_id))
+
+    # Check which of today's promotions already have a campaign, in one query
+    existing_campaigns = find_existing_campaigns(
+        db, restaurant_id, promotion_campaign_started_ids(recipe_index.recipes, today)
+    )
+
+    result = build_inventory_forecast(
+        restaurant.id,
+        restaurant.name,
+        current_inventory,
+        forecast_df,
+        recipe_index,
+        set(existing_campaigns),
+        today
+    )
+    # Without a stored forecast the result came from a refresh, cached once it is read from the table
+    if forecast_version is not None:
+        inventory_forecast_cache.put(cache_key, result)
+    return result
+
+
+@router.get("/cache", response_model=InventoryForecastCacheStats)
+async def get_inventory_forecast_cache_stats():
+    """Get hit and miss counters of the per-restaurant inventory forecast cache"""
+    return InventoryForecastCacheStats(**inventory_forecast_cache.stats())
+
+
+@router.get(
+    "/fleet",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {"schema": InventoryForecastResponse.model_json_schema()}}}}
+)
+async def get_fleet_inventory_forecast(db: Session = Depends(get_db)):
+    """Inventory forecasts of every restaurant as newline-delimited JSON.
+
+    Each line is an InventoryForecastResponse, streamed as soon as it is ready.
+    The sales forecast is computed once for the whole fleet and inventory,
+    orders and campaigns are loaded in bulk, a chunk of restaurants at a time.
+    """
+    forecast_df, recipe_index = await load_inventory_forecast_inputs(db)
+    return StreamingResponse(
+        stream_fleet_inventory_forecasts(forecast_df, recipe_index),
+        media_type=NDJSON_MEDIA_TYPE
+    )
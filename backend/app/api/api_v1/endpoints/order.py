@@ -5,6 +5,7 @@ from typing import List
 from app.db.session import get_db
 from app.db.models import Restaurant, Inventory, Order, RestaurantOrder
 from app.schemas.order import OrderCreate, OrderResponse, OrderListResponse
+from app.services.inventory_cache import bump_restaurant_version
 
 router = APIRouter()
 
@@ -50,6 +51,7 @@ async def create_order(order: OrderCreate, restaurant_id: str = Path(...), db: S
     )
     
     db.add(restaurant_order)
+    bump_restaurant_version(db, restaurant_id)
     db.commit()
     db.refresh(new_order)
     
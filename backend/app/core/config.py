@@ -0,0 +1,82 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Forecast models
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(APP_DIR, "api", "api_v1", "endpoints", "models"))
+# Minimum number of seconds between two checks of a model file for changes
+MODEL_RELOAD_CHECK_INTERVAL = float(os.getenv("MODEL_RELOAD_CHECK_INTERVAL", "30"))
+
+# Menu item recipes used to turn sales forecasts into ingredient requirements
+RECIPES_PATH = os.getenv("RECIPES_PATH", os.path.join(APP_DIR, "data", "recipes.json"))
+
+# Inventory forecast results cached per restaurant, 0 disables the cache
+INVENTORY_FORECAST_CACHE_SIZE = int(os.getenv("INVENTORY_FORECAST_CACHE_SIZE", "1024"))
+
+# Seconds the integer program refining the promotion mix may run, 0 to skip it
+PROMOTION_SOLVER_TIME_LIMIT = float(os.getenv("PROMOTION_SOLVER_TIME_LIMIT", "0.02"))
+
+# Weather data used as model input
+FORECAST_LATITUDE = float(os.getenv("FORECAST_LATITUDE", "52.52"))
+FORECAST_LONGITUDE = float(os.getenv("FORECAST_LONGITUDE", "13.41"))
+# "open-meteo" for the live API or "file" to read WEATHER_FILE_PATH instead
+WEATHER_PROVIDER = os.getenv("WEATHER_PROVIDER", "open-meteo")
+WEATHER_API_URL = os.getenv("WEATHER_API_URL", "https://api.open-meteo.com/v1/forecast")
+WEATHER_FILE_PATH = os.getenv("WEATHER_FILE_PATH", os.path.join(APP_DIR, "data", "sample_weather.json"))
+# Seconds a fetched forecast is served without revalidation
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "3600"))
+# Seconds after the TTL during which stale data is served while refreshing in the background
+WEATHER_STALE_TTL = float(os.getenv("WEATHER_STALE_TTL", "21600"))
+# Directory for the last good forecast, used on cold starts and upstream outages
+WEATHER_SNAPSHOT_DIR = os.getenv("WEATHER_SNAPSHOT_DIR", os.path.join(APP_DIR, "data", "weather_snapshots"))
+
+# Shared outgoing HTTP client
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+# Retries after the first failed weather request (timeouts, connection errors and 5xx)
+WEATHER_MAX_RETRIES = int(os.getenv("WEATHER_MAX_RETRIES", "2"))
+
+# Campaign message sends
+# Webhook generating promotional messages, called with the customer's name
+CAMPAIGN_WEBHOOK_URL = os.getenv(
+    "CAMPAIGN_WEBHOOK_URL", "https://noam.app.n8n.cloud/webhook/6ac2c534-dfb0-4b96-9d75-2b9ba36fdbe8"
+)
+# Webhook calls in flight per campaign, and connections to one host
+CAMPAIGN_CONCURRENCY = int(os.getenv("CAMPAIGN_CONCURRENCY", "20"))
+CAMPAIGN_LIMIT_PER_HOST = int(os.getenv("CAMPAIGN_LIMIT_PER_HOST", "20"))
+# Maximum webhook calls started per second, 0 for no limit
+CAMPAIGN_SEND_RATE = float(os.getenv("CAMPAIGN_SEND_RATE", "0"))
+# Seconds to wait for a generated message
+CAMPAIGN_READ_TIMEOUT = float(os.getenv("CAMPAIGN_READ_TIMEOUT", "60"))
+# Retries after a timeout, connection error, 5xx or unusable response, with jittered exponential backoff
+CAMPAIGN_MAX_RETRIES = int(os.getenv("CAMPAIGN_MAX_RETRIES", "3"))
+CAMPAIGN_RETRY_BACKOFF = float(os.getenv("CAMPAIGN_RETRY_BACKOFF", "0.5"))
+CAMPAIGN_RETRY_BACKOFF_MAX = float(os.getenv("CAMPAIGN_RETRY_BACKOFF_MAX", "30"))
+
+# "template" to generate one message per campaign and personalize it for each customer,
+# "per_customer" to generate every customer's message; a campaign can ask for either
+CAMPAIGN_MESSAGE_MODE = os.getenv("CAMPAIGN_MESSAGE_MODE", "template")
+# Customers read per round trip when streaming a campaign's audience
+CAMPAIGN_AUDIENCE_CHUNK_SIZE = int(os.getenv("CAMPAIGN_AUDIENCE_CHUNK_SIZE", "1000"))
+# Generated messages stored per transaction, and seconds a message may wait for its batch
+CAMPAIGN_WRITE_BATCH_SIZE = int(os.getenv("CAMPAIGN_WRITE_BATCH_SIZE", "500"))
+CAMPAIGN_WRITE_INTERVAL = float(os.getenv("CAMPAIGN_WRITE_INTERVAL", "2"))
+# Campaign jobs: workers per process (0 leaves jobs queued for other processes), seconds between
+# polls of an empty queue, seconds without a heartbeat before a running job is taken over by
+# another worker, and attempts before a job that keeps erroring is marked failed
+CAMPAIGN_WORKERS = int(os.getenv("CAMPAIGN_WORKERS", "2"))
+CAMPAIGN_JOB_POLL_INTERVAL = float(os.getenv("CAMPAIGN_JOB_POLL_INTERVAL", "2"))
+CAMPAIGN_JOB_LEASE = float(os.getenv("CAMPAIGN_JOB_LEASE", "120"))
+CAMPAIGN_JOB_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_JOB_MAX_ATTEMPTS", "3"))
+
+# "sklearn" to call GradientBoostingRegressor.predict, "compiled" for the NumPy tree engine
+FORECAST_INFERENCE_ENGINE = os.getenv("FORECAST_INFERENCE_ENGINE", "sklearn")
+
+# Seconds between refreshes of the precomputed forecast table, 0 disables the scheduler
+FORECAST_REFRESH_INTERVAL = float(os.getenv("FORECAST_REFRESH_INTERVAL", "3600"))
+# Precomputed forecasts older than this many seconds are ignored in favour of a live computation
+FORECAST_MAX_AGE = float(os.getenv("FORECAST_MAX_AGE", "7200"))
@@ -1,6 +1,6 @@
 from uuid import uuid4
 import datetime
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, Float, UniqueConstraint, CheckConstraint, DateTime
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, Boolean, Float, UniqueConstraint, CheckConstraint, DateTime, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
@@ -13,6 +13,7 @@ def get_uuid():
 class Restaurant(Base):
     id = Column(String(32), primary_key=True, unique=True, default=get_uuid)
     name = Column(String(255), nullable=False)
+    data_version = Column(Integer, default=0, nullable=False)  # Bumped by writes its inventory forecast depends on
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -118,3 +119,54 @@ class Messages(Base):
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
 
     conversation = relationship("Conversation", back_populates="messages")
+
+
+class Forecast(Base):
+    """Precomputed sales predictions, refreshed periodically by the forecast scheduler"""
+    id = Column(String(32), primary_key=True, unique=True, default=get_uuid)
+    date = Column(Date, nullable=False, index=True)
+    item = Column(String(255), nullable=False)  # e.g. 'burger_sales'
+    predicted_quantity = Column(Float, nullable=False)
+    model_version = Column(String(64), nullable=False)
+    weather_snapshot_id = Column(String(64), nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (UniqueConstraint('date', 'item', name='uix_forecast_date_item'),)
+
+
+class CampaignJob(Base):
+    """A campaign's message sends, queued for the campaign workers"""
+    id = Column(String(32), primary_key=True, unique=True, default=get_uuid)
+    campaign_id = Column(String(32), ForeignKey("campaign.id"), nullable=False, unique=True, index=True)
+    restaurant_id = Column(String(32), ForeignKey("restaurant.id"), nullable=False, index=True)
+    status = Column(String(20), default="queued", nullable=False, index=True)  # queued, running, done or failed
+    message_mode = Column(String(20), default="template", nullable=False)  # template or per_customer
+    message_template = Column(Text, nullable=True)  # Generated once per campaign in template mode
+    total = Column(Integer, default=0, nullable=False)  # Customers to send to
+    failed = Column(Integer, default=0, nullable=False)  # Sends that failed in the latest attempt
+    attempts = Column(Integer, default=0, nullable=False)
+    locked_at = Column(DateTime, nullable=True)  # Last heartbeat of the worker running the job
+    lock_token = Column(String(32), nullable=True)  # Claim of the worker running the job, fences its writes
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    campaign = relationship("Campaign")
+
+
+class CampaignRecipient(Base):
+    """A customer a campaign is sent to, with the state of their send"""
+    id = Column(String(32), primary_key=True, unique=True, default=get_uuid)
+    campaign_id = Column(String(32), ForeignKey("campaign.id"), nullable=False)
+    customer_id = Column(String(32), ForeignKey("customer.id"), nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # pending, sent or failed
+    attempts = Column(Integer, default=0, nullable=False)  # Sends tried, over all runs of the job
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('campaign_id', 'customer_id', name='uix_campaign_recipient'),
+        Index('ix_campaignrecipient_campaign_id_status', 'campaign_id', 'status'),
+    )
@@ -1,18 +1,75 @@
 from app.api.api_v1.api import api_router
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from app.db.init_db import init_db
 from app.db.session import get_db
+from app.services.model_registry import model_registry
+from app.services.http import close_http_session
+from app.services.recipes import recipe_registry
+from app.services.promotion_solver import warm_up_promotion_solver
+from app.api.api_v1.endpoints.forecast import run_forecast_scheduler, warm_up_forecast
+from app.api.api_v1.endpoints.campaign import run_campaign_worker
+from app.core.config import FORECAST_REFRESH_INTERVAL, CAMPAIGN_WORKERS, CAMPAIGN_JOB_POLL_INTERVAL
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Initialize database on startup
+    logger.info("Initializing database...")
+    logger.info("Note: If the database is empty, it will be automatically seeded with sample data")
+    success = init_db(max_retries=30, retry_interval=2)  # More retries with longer interval
+    if success:
+        logger.info("Database initialized successfully!")
+    else:
+        logger.error("Failed to initialize database after multiple attempts")
+
+    # Load the forecast models once so requests share the same instances, and import
+    # the ML stack here rather than on the first forecast request
+    logger.info("Loading forecast models...")
+    started = time.perf_counter()
+    model_registry.load_all()
+    warm_up_forecast()
+    logger.info(f"Forecast models loaded (version {model_registry.version}) "
+                f"in {time.perf_counter() - started:.2f}s")
+
+    # Build the recipe index used by the inventory forecasts, and import the
+    # promotion mix solvers here rather than on the first inventory forecast
+    recipe_registry.load()
+    warm_up_promotion_solver()
+
+    # Keep the precomputed forecast table up to date
+    scheduler = None
+    if FORECAST_REFRESH_INTERVAL > 0:
+        scheduler = asyncio.create_task(run_forecast_scheduler(FORECAST_REFRESH_INTERVAL))
+
+    # Send queued campaigns in the background
+    campaign_workers = [
+        asyncio.create_task(run_campaign_worker(CAMPAIGN_JOB_POLL_INTERVAL)) for _ in range(CAMPAIGN_WORKERS)
+    ]
+
+    yield
+
+    if scheduler is not None:
+        scheduler.cancel()
+    for worker in campaign_workers:
+        worker.cancel()
+    await asyncio.gather(*campaign_workers, return_exceptions=True)
+    await close_http_session()
+
+
 app = FastAPI(
     title="Restaurant Inventory Prediction API",
     description="API for predicting restaurant inventory needs",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,19 +81,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database on startup
-
-
-@app.on_event("startup")
-def on_startup():
-    logger.info("Initializing database...")
-    logger.info("Note: If the database is empty, it will be automatically seeded with sample data")
-    success = init_db(max_retries=30, retry_interval=2)  # More retries with longer interval
-    if success:
-        logger.info("Database initialized successfully!")
-    else:
-        logger.error("Failed to initialize database after multiple attempts")
-
 
 @app.get("/")
 async def root():
@@ -0,0 +1,19 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class CampaignJobProgress(BaseModel):
+    job_id: str
+    campaign_id: str
+    status: str  # queued, running, done or failed
+    message_mode: str  # template or per_customer
+    total: int  # Recipients, the restaurant's customers when the job first ran
+    sent: int  # Recipients whose message is stored, over all attempts
+    failed: int  # Recipients whose send failed, sent again by retry-failed
+    pending: int  # Recipients still to send to
+    attempts: int  # Runs of the job since it was queued or resumed
+    last_error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
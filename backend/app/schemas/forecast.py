@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime
 
 class ForecastItem(BaseModel):
     date: date
@@ -10,3 +10,38 @@ class ForecastItem(BaseModel):
 
 class ForecastResponse(BaseModel):
     items: List[ForecastItem]
+
+class ForecastColumnarResponse(BaseModel):
+    dates: List[date]
+    items: List[str]
+    values: List[List[float]]  # One row per item, aligned with dates
+
+class ModelStatus(BaseModel):
+    name: str
+    version: str
+    sha256: str
+    engine: str  # "compiled" or "sklearn"
+    load_seconds: float
+    loaded_at: datetime
+
+class ModelStatusResponse(BaseModel):
+    version: str  # Combined version of all loaded models
+    models: List[ModelStatus]
+
+class RestaurantLocation(BaseModel):
+    restaurant_id: str
+    latitude: Optional[float] = None  # Defaults to the configured forecast location
+    longitude: Optional[float] = None
+
+class BatchForecastRequest(BaseModel):
+    restaurants: List[RestaurantLocation]
+
+class RestaurantForecast(BaseModel):
+    restaurant_id: str
+    latitude: float
+    longitude: float
+    items: List[ForecastItem] = []
+    error: Optional[str] = None  # Set when no forecast could be made for this location
+
+class BatchForecastResponse(BaseModel):
+    forecasts: List[RestaurantForecast]
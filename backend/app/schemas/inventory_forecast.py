@@ -10,11 +10,14 @@ class InventoryForecastItem(BaseModel):
     unit: str = "units"
     menu_items: List[str] = []  # List of menu items that require this ingredient
     ordered_amount: int = 0  # Amount of this item that has been ordered but not yet received
+    stockout_date: Optional[date] = None  # First forecast day the item runs out, None if it lasts
+    daily_balances: List[int] = []  # Amount left at the end of each forecast day, like difference
 
 class PromotionRecommendation(BaseModel):
     menu_item: str
     reason: str  # Why this item is recommended for promotion
     potential_quantity: int  # How many of this item could be produced with excess ingredients
+    allocated_quantity: int = 0  # How many to promote when all recommended items share the excess ingredients
     ingredient_excesses: List[Dict[str, str]]  # Details about excess ingredients
     campaign_started_id: Optional[str] = None  # Unique identifier for campaign based on date and product
 
@@ -28,3 +31,10 @@ class InventoryForecastResponse(BaseModel):
     forecast_summary: InventoryForecastSummary
     promotion_recommendations: List[PromotionRecommendation]
     promotable_menu_items_count: int = 0
+
+class InventoryForecastCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+    size: int  # Cached results, including outdated ones not yet evicted
+    max_size: int
@@ -0,0 +1,249 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert, or_, update
+from sqlalchemy.orm import Session
+
+from app.db.models import CampaignJob, CampaignRecipient, get_uuid
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Recipient states, failed is shared with jobs
+PENDING = "pending"
+SENT = "sent"
+
+# Message modes: one generated template personalized per customer, or one generation per customer
+TEMPLATE = "template"
+PER_CUSTOMER = "per_customer"
+
+
+def enqueue_campaign_job(db: Session, campaign_id: str, restaurant_id: str, total: int,
+                         message_mode: str) -> CampaignJob:
+    """Add a campaign's sends to the queue, committed with the caller's transaction"""
+    job = CampaignJob(campaign_id=campaign_id, restaurant_id=restaurant_id, status=QUEUED, total=total,
+                      message_mode=message_mode)
+    db.add(job)
+    return job
+
+
+class LeaseLost(Exception):
+    """The job was taken over by another worker, or requeued, while this one ran it"""
+
+
+@dataclass
+class ClaimedJob:
+    """A job as claimed by a worker
+
+    Read once at claim time, so running the job never reloads its row. The
+    token identifies this claim: every write to the job is conditional on it,
+    so a worker whose lease expired can't overwrite the job's state once
+    another worker has claimed it.
+    """
+    id: str
+    campaign_id: str
+    restaurant_id: str
+    message_mode: str
+    message_template: Optional[str]
+    attempts: int
+    token: str
+
+
+def claim_campaign_job(db: Session, lease: float) -> Optional[ClaimedJob]:
+    """Take the oldest queued job, or a running one whose worker stopped sending heartbeats
+
+    The row is locked with FOR UPDATE SKIP LOCKED, so workers in any number of
+    processes don't wait on each other's claims, and only updated if it is
+    still as it was read, so a job is claimed once also where the lock is
+    ignored (SQLite). A running job is only reclaimed once its heartbeat is
+    older than lease seconds, which is how jobs interrupted by a restart are
+    picked up again.
+    """
+    now = datetime.now()
+    job = (
+        db.query(CampaignJob)
+        .filter(or_(
+            CampaignJob.status == QUEUED,
+            (CampaignJob.status == RUNNING) & (CampaignJob.locked_at < now - timedelta(seconds=lease))
+        ))
+        .order_by(CampaignJob.created_at)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    claimed = ClaimedJob(
+        id=job.id,
+        campaign_id=job.campaign_id,
+        restaurant_id=job.restaurant_id,
+        message_mode=job.message_mode,
+        message_template=job.message_template,
+        attempts=job.attempts + 1,
+        token=get_uuid(),
+    )
+    updated = (
+        db.query(CampaignJob)
+        .filter(CampaignJob.id == job.id, CampaignJob.status == job.status, CampaignJob.lock_token == job.lock_token)
+        .update({
+            "status": RUNNING,
+            "attempts": claimed.attempts,
+            "failed": 0,
+            "locked_at": now,
+            "lock_token": claimed.token,
+        }, synchronize_session=False)
+    )
+    db.commit()
+    return claimed if updated == 1 else None
+
+
+def _update_claimed_job(db: Session, job: ClaimedJob, **values) -> bool:
+    """Write to a job only while it is still running under this claim, True if it was"""
+    updated = (
+        db.query(CampaignJob)
+        .filter(CampaignJob.id == job.id, CampaignJob.lock_token == job.token, CampaignJob.status == RUNNING)
+        .update(values, synchronize_session=False)
+    )
+    db.commit()
+    return updated == 1
+
+
+def heartbeat_campaign_job(db: Session, job: ClaimedJob):
+    """Record that the job's worker is alive
+
+    Raises:
+        LeaseLost: If the job is no longer held by this claim
+    """
+    if not _update_claimed_job(db, job, locked_at=datetime.now()):
+        raise LeaseLost(f"Lost the lease of campaign job {job.id}")
+
+
+def save_message_template(db: Session, job: ClaimedJob, template: Optional[str]):
+    """Keep the job's template, so a resumed job personalizes the same one
+
+    Without a template the job falls back to one generation per customer.
+
+    Raises:
+        LeaseLost: If the job is no longer held by this claim
+    """
+    message_mode = job.message_mode if template is not None else PER_CUSTOMER
+    if not _update_claimed_job(db, job, message_mode=message_mode, message_template=template):
+        raise LeaseLost(f"Lost the lease of campaign job {job.id}")
+    job.message_mode = message_mode
+    job.message_template = template
+
+
+def finish_campaign_job(db: Session, job: ClaimedJob, failed: int):
+    """Mark the job done
+
+    Raises:
+        LeaseLost: If the job is no longer held by this claim
+    """
+    if not _update_claimed_job(db, job, status=DONE, failed=failed, locked_at=None, lock_token=None):
+        raise LeaseLost(f"Lost the lease of campaign job {job.id}")
+
+
+def requeue_campaign_job(db: Session, job: ClaimedJob):
+    """Put an interrupted job back in the queue, without counting the attempt"""
+    db.rollback()
+    _update_claimed_job(db, job, status=QUEUED, attempts=job.attempts - 1, locked_at=None, lock_token=None)
+
+
+def fail_campaign_job(db: Session, job: ClaimedJob, error: str, max_attempts: int):
+    """Queue the job again after an error, or mark it failed after max_attempts"""
+    db.rollback()
+    _update_claimed_job(db, job, status=FAILED if job.attempts >= max_attempts else QUEUED,
+                        last_error=error[:1000], locked_at=None, lock_token=None)
+
+
+def resume_campaign_job(job: CampaignJob):
+    """Queue a finished or failed job again, committed with the caller's transaction
+
+    Only its pending recipients are sent to, with a fresh set of attempts.
+    """
+    job.status = QUEUED
+    job.attempts = 0
+    job.last_error = None
+    job.locked_at = None
+    job.lock_token = None
+
+
+def has_recipients(db: Session, campaign_id: str) -> bool:
+    return db.query(CampaignRecipient.id).filter(CampaignRecipient.campaign_id == campaign_id).first() is not None
+
+
+def add_campaign_recipients(db: Session, job: ClaimedJob, audience: Iterable[Tuple[str, bool]],
+                            chunk_size: int) -> int:
+    """Record who a job sends to, before its first send
+
+    Customers who already have the campaign's conversation, from a job queued
+    before recipients were recorded, start as sent and the others as pending.
+    The rows are inserted chunk_size at a time but committed together with
+    the job's total, and only while the job is still held by this claim, so a
+    job interrupted meanwhile records them again from scratch.
+
+    Args:
+        audience: (id, already sent) of each customer of the restaurant
+
+    Returns:
+        Number of recipients
+
+    Raises:
+        LeaseLost: If the job is no longer held by this claim
+    """
+    now = datetime.now()
+    total = 0
+    chunk: List[Dict] = []
+    for customer_id, sent in audience:
+        chunk.append({
+            "id": get_uuid(),
+            "campaign_id": job.campaign_id,
+            "customer_id": customer_id,
+            "status": SENT if sent else PENDING,
+            "attempts": 0,
+            "created_at": now,
+            "updated_at": now,
+        })
+        if len(chunk) >= chunk_size:
+            db.execute(insert(CampaignRecipient), chunk)
+            total += len(chunk)
+            chunk = []
+    if chunk:
+        db.execute(insert(CampaignRecipient), chunk)
+        total += len(chunk)
+    if not _update_claimed_job(db, job, total=total):
+        raise LeaseLost(f"Lost the lease of campaign job {job.id}")
+    return total
+
+
+def retry_failed_recipients(db: Session, campaign_id: str) -> int:
+    """Make a campaign's failed recipients pending again, committed with the caller's transaction
+
+    Returns:
+        Number of recipients to retry
+    """
+    result = db.execute(
+        update(CampaignRecipient)
+        .where(CampaignRecipient.campaign_id == campaign_id, CampaignRecipient.status == FAILED)
+        .values(status=PENDING)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def count_recipients(db: Session, campaign_id: str) -> Dict[str, int]:
+    """Count a campaign's recipients by state, in one query"""
+    rows = (
+        db.query(CampaignRecipient.status, func.count(CampaignRecipient.id))
+        .filter(CampaignRecipient.campaign_id == campaign_id)
+        .group_by(CampaignRecipient.status)
+        .all()
+    )
+    return {status: count for status, count in rows}
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+from sqlalchemy import bindparam, insert, update
+from sqlalchemy.orm import Session
+
+from app.db.models import CampaignRecipient, Conversation, Messages, get_uuid
+from app.services.campaign_jobs import FAILED, PENDING, SENT
+from app.services.threads import run_to_completion
+
+recipients = CampaignRecipient.__table__
+
+logger = logging.getLogger(__name__)
+
+
+class CampaignResultWriter:
+    """Store a campaign's generated messages and the state of their recipients in batches
+
+    Each batch is written in one transaction with one UPDATE marking its
+    recipients sent, one multi-row INSERT for the conversations and one for
+    their messages, so a recipient is sent exactly when its message is
+    stored. The UPDATE only takes recipients still pending with the attempts
+    they were read with, and only the ones it returns get a conversation, so
+    a recipient another worker stored meanwhile isn't stored twice. Ids are
+    generated client-side, so the messages don't need the conversations read
+    back. Failed sends are recorded on their recipients, under the same
+    condition, in the same transaction. A batch is due once it holds batch_size results
+    or its oldest one has waited interval seconds, so progress and crash
+    recovery lag by at most one batch.
+
+    add and fail only buffer. Callers on the event loop write the batches
+    with write_due and write_all, which run them in the threadpool, and
+    other callers with flush.
+    """
+
+    def __init__(self, db: Session, campaign_id: str, batch_size: int, interval: float):
+        self.db = db
+        self.campaign_id = campaign_id
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.written = 0
+        self.failed = 0
+        self.write_seconds = 0.0  # Spent writing batches, successful or not
+        self._conversations: List[Dict] = []
+        self._messages: List[Dict] = []
+        self._sent: List[Tuple[str, int]] = []  # Recipient ids with the attempts they were read with
+        self._failures: List[Dict] = []
+        self._oldest = 0.0
+        self._writing = asyncio.Lock()
+
+    def add(self, recipient_id: str, attempts: int, customer_id: str, message: str):
+        """Buffer a recipient's message, attempts being the recipient's when it was read"""
+        now = datetime.now()
+        conversation_id = get_uuid()
+        self._started()
+        self._sent.append((recipient_id, attempts))
+        self._conversations.append({
+            "id": conversation_id,
+            "campaign_id": self.campaign_id,
+            "customer_id": customer_id,
+            "created_at": now,
+            "updated_at": now,
+        })
+        self._messages.append({
+            "id": get_uuid(),
+            "conversation_id": conversation_id,
+            "role": "system",
+            "message": message,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    def fail(self, recipient_id: str, attempts: int, error: str):
+        """Buffer a recipient whose message could not be generated, attempts being the recipient's when it was read"""
+        self._started()
+        self._failures.append({"recipient_id": recipient_id, "read_attempts": attempts, "error": error[:1000]})
+
+    def _started(self):
+        if not self._sent and not self._failures:
+            self._oldest = time.monotonic()
+
+    @property
+    def due(self) -> bool:
+        """Whether the buffered results should be written now"""
+        buffered = len(self._sent) + len(self._failures)
+        return buffered > 0 and (buffered >= self.batch_size or time.monotonic() - self._oldest >= self.interval)
+
+    async def write_due(self):
+        """Write the buffered results in the threadpool if they are due
+
+        Left for a later call while another batch is being written, so the
+        sends go on meanwhile.
+        """
+        if self.due and not self._writing.locked():
+            await self.write_all()
+
+    async def write_all(self):
+        """Write the buffered results in the threadpool, after the batch being written if any
+
+        Writes run one at a time, and to their end even if the caller is
+        cancelled, as they share the session.
+        """
+        async with self._writing:
+            await run_to_completion(self._write, self._take_batch())
+
+    def flush(self):
+        """Write the buffered results in the calling thread"""
+        self._write(self._take_batch())
+
+    def _take_batch(self) -> Tuple[List[Dict], List[Dict], List[Tuple[str, int]], List[Dict]]:
+        batch = self._conversations, self._messages, self._sent, self._failures
+        self._conversations, self._messages, self._sent, self._failures = [], [], [], []
+        return batch
+
+    def _write(self, batch: Tuple[List[Dict], List[Dict], List[Tuple[str, int]], List[Dict]]):
+        """Write a batch of results; messages that can't be written count as failed
+
+        Their recipients stay pending, to be sent again when the job resumes.
+        """
+        conversations, messages, sent, failures = batch
+        if not sent and not failures:
+            return
+        started = time.monotonic()
+        try:
+            taken = set()
+            by_attempts: Dict[int, List[str]] = defaultdict(list)
+            for recipient_id, attempts in sent:
+                by_attempts[attempts].append(recipient_id)
+            for attempts, recipient_ids in by_attempts.items():
+                taken.update(self.db.execute(
+                    update(recipients)
+                    .where(recipients.c.id.in_(recipient_ids), recipients.c.status == PENDING,
+                           recipients.c.attempts == attempts)
+                    .values(status=SENT, attempts=recipients.c.attempts + 1, last_error=None)
+                    .returning(recipients.c.id)
+                ).scalars())
+            kept = [i for i, (recipient_id, _) in enumerate(sent) if recipient_id in taken]
+            if kept:
+                self.db.execute(insert(Conversation), [conversations[i] for i in kept])
+                self.db.execute(insert(Messages), [messages[i] for i in kept])
+            if failures:
+                self.db.execute(
+                    update(recipients)
+                    .where(recipients.c.id == bindparam("recipient_id"), recipients.c.status == PENDING,
+                           recipients.c.attempts == bindparam("read_attempts"))
+                    .values(status=FAILED, attempts=recipients.c.attempts + 1, last_error=bindparam("error")),
+                    failures
+                )
+            self.db.commit()
+            self.written += len(kept)
+            if len(kept) < len(sent):
+                logger.warning(f"Skipped {len(sent) - len(kept)} messages of campaign {self.campaign_id} "
+                               f"stored by another worker")
+        except Exception as e:
+            self.db.rollback()
+            self.failed += len(sent)
+            logger.error(f"Error storing {len(sent)} messages of campaign {self.campaign_id}: {e!r}")
+        finally:
+            self.write_seconds += time.monotonic() - started
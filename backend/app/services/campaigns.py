@@ -0,0 +1,84 @@
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+
+from app.db.models import Campaign, CampaignRecipient, Conversation, Customer, RestaurantCustomer
+from app.services.campaign_jobs import PENDING
+
+
+def find_existing_campaigns(db: Session, restaurant_id: str, campaign_started_ids: Iterable[str]) -> Dict[str, Campaign]:
+    """Get a restaurant's campaigns started with any of the given identifiers, in one query
+
+    Returns:
+        Dictionary mapping each campaign_started_id that already exists to its campaign
+    """
+    campaign_started_ids = list(dict.fromkeys(campaign_started_ids))
+    if not campaign_started_ids:
+        return {}
+
+    campaigns = db.query(Campaign).filter(
+        Campaign.restaurant_id == restaurant_id,
+        Campaign.campaign_started_id.in_(campaign_started_ids)
+    ).all()
+    return {campaign.campaign_started_id: campaign for campaign in campaigns}
+
+
+def find_existing_campaign_ids(db: Session, restaurant_ids: List[str],
+                               campaign_started_ids: Iterable[str]) -> Dict[str, Set[str]]:
+    """Find which of the given campaign identifiers several restaurants already started, in one query
+
+    Returns:
+        Dictionary mapping restaurant ids to the campaign_started_ids that exist
+        for them. Restaurants without any are left out.
+    """
+    campaign_started_ids = list(dict.fromkeys(campaign_started_ids))
+    if not restaurant_ids or not campaign_started_ids:
+        return {}
+
+    rows = db.query(Campaign.restaurant_id, Campaign.campaign_started_id).filter(
+        Campaign.restaurant_id.in_(restaurant_ids),
+        Campaign.campaign_started_id.in_(campaign_started_ids)
+    ).all()
+    existing: Dict[str, Set[str]] = {}
+    for restaurant_id, campaign_started_id in rows:
+        existing.setdefault(restaurant_id, set()).add(campaign_started_id)
+    return existing
+
+
+def iter_campaign_audience(db: Session, restaurant_id: str, campaign_id: str,
+                           chunk_size: int) -> Iterator[Tuple[str, bool]]:
+    """Stream the id of each of a restaurant's customers, and whether they already have the campaign
+
+    One query read chunk_size rows at a time through a server-side cursor,
+    so memory does not grow with the audience. The cursor lives until the
+    iteration ends: use a session that is not committed meanwhile.
+    """
+    already_sent = exists().where(
+        Conversation.campaign_id == campaign_id,
+        Conversation.customer_id == RestaurantCustomer.customer_id
+    )
+    rows = (
+        db.query(RestaurantCustomer.customer_id, already_sent)
+        .filter(RestaurantCustomer.restaurant_id == restaurant_id)
+        .yield_per(chunk_size)
+    )
+    for customer_id, sent in rows:
+        yield customer_id, bool(sent)
+
+
+def iter_pending_recipients(db: Session, campaign_id: str, chunk_size: int) -> Iterator[Tuple[str, int, str, str]]:
+    """Stream the recipient id, send attempts, customer id and name of each recipient of a campaign still to send to
+
+    The attempts let the results be stored only if no other worker stored
+    the recipient's meanwhile. Read like iter_campaign_audience, with the
+    same caveat on committing.
+    """
+    rows = (
+        db.query(CampaignRecipient.id, CampaignRecipient.attempts, Customer.id, Customer.name)
+        .join(Customer, CampaignRecipient.customer_id == Customer.id)
+        .filter(CampaignRecipient.campaign_id == campaign_id, CampaignRecipient.status == PENDING)
+        .yield_per(chunk_size)
+    )
+    for recipient_id, attempts, customer_id, name in rows:
+        yield recipient_id, attempts, customer_id, name
@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import random
+import time
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterable, Awaitable, Callable, Iterable, Optional, TypeVar, Union
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class RetryableError(Exception):
+    """A failure worth retrying, such as a 5xx response or an unusable body"""
+
+
+# Raised by aiohttp for timeouts and dropped or refused connections
+RETRYABLE_EXCEPTIONS = (RetryableError, asyncio.TimeoutError, aiohttp.ClientConnectionError)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Seconds to wait before retry number attempt + 1, with full jitter
+
+    A random delay up to base * 2 ** attempt (at most cap) spreads the
+    retries of calls that failed together instead of repeating the burst.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+async def call_with_retries(call: Callable[[], Awaitable[R]], max_retries: int, backoff: float,
+                            backoff_max: float, on_retry: Optional[Callable[[], None]] = None) -> R:
+    """Await call(), retrying timeouts, connection errors and RetryableErrors
+
+    Other exceptions are raised at once; the last retryable one is raised
+    once max_retries retries have failed too.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await call()
+        except RETRYABLE_EXCEPTIONS as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(f"Retrying after attempt {attempt + 1} failed: {e!r}")
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(backoff_delay(attempt, backoff, backoff_max))
+
+
+class RateLimiter:
+    """Space the start of calls at least 1 / rate seconds apart, rate 0 for no limit"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        await asyncio.sleep(start - now)
+
+
+@dataclass
+class FanOutStats:
+    """Outcome and throughput of a fan-out"""
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retries: int = 0
+    elapsed: float = 0.0  # Seconds from the first call to the last result
+    latencies: array = field(default_factory=lambda: array("d"))  # Seconds each send took, retries included
+
+    @property
+    def per_second(self) -> float:
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+    def latency_percentile(self, percent: float) -> float:
+        """Seconds within which percent of the sends finished, 0 without sends"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+async def fan_out(items: Union[Iterable[T], AsyncIterable[T]], send: Callable[[T], Awaitable[Any]], concurrency: int,
+                  rate: float = 0, stats: Optional[FanOutStats] = None) -> FanOutStats:
+    """Call send(item) for every item with at most concurrency calls in flight
+
+    A fixed pool of workers pulls items from the iterable as they finish, so
+    only concurrency coroutines exist at a time whatever the number of items,
+    and items are read lazily. A send that raises counts as failed; it does
+    not stop the others.
+
+    Args:
+        items: Items to send, an async iterable is read by one worker at a time
+        send: Coroutine function sending one item, retrying on its own if needed
+        concurrency: Maximum number of sends in flight
+        rate: Maximum sends started per second, 0 for no limit
+        stats: Stats to update, for callers counting retries in send
+
+    Returns:
+        Counts of sent and failed items and the time they took
+    """
+    stats = stats if stats is not None else FanOutStats()
+    limiter = RateLimiter(rate)
+    if isinstance(items, AsyncIterable):
+        async_iterator = items.__aiter__()
+        reading = asyncio.Lock()
+
+        async def next_items():
+            while True:
+                async with reading:
+                    try:
+                        item = await async_iterator.__anext__()
+                    except StopAsyncIteration:
+                        return
+                yield item
+    else:
+        iterator = iter(items)
+
+        async def next_items():
+            for item in iterator:
+                yield item
+
+    async def worker():
+        async for item in next_items():
+            await limiter.wait()
+            stats.total += 1
+            started = time.monotonic()
+            try:
+                await send(item)
+                stats.succeeded += 1
+            except Exception as e:
+                stats.failed += 1
+                logger.error(f"Send failed: {e!r}")
+            stats.latencies.append(time.monotonic() - started)
+
+    start = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    stats.elapsed = time.monotonic() - start
+    return stats
@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+DAILY_FEATURES = ['temperature_2m_mean', 'sunshine_duration', 'rain_sum', 'snowfall_sum']
+DATE_FEATURES = ['month', 'day_of_week', 'day_of_month']
+WEATHER_DESCRIPTION_PREFIX = 'weather_description_'
+# Approximated from temperature and precipitation since Open-Meteo has no description.
+# Order matters: the first matching condition wins, anything else is 'Cloudy'.
+WEATHER_DESCRIPTIONS = ['Rain', 'Light Drizzle', 'Snow', 'Light Snow', 'Sunny', 'Mainly Sunny', 'Cloudy']
+
+
+@dataclass
+class WeatherFeatures:
+    """Model input for a range of days, laid out by a FeatureSchema"""
+    dates: np.ndarray  # datetime64[D], one per row
+    X: np.ndarray  # (days, features)
+    schema: "FeatureSchema"
+
+
+class FeatureSchema:
+    """Fixed feature layout shared by a set of models.
+
+    Built once from the models' ``feature_names_in_`` and used to fill a
+    preallocated array straight from the Open-Meteo JSON, so the layout does
+    not depend on which weather descriptions occur in a forecast. Features the
+    weather data has no source for are left at 0; this includes the
+    unit-suffixed names such as 'temperature_2m_mean (°C)' the models were
+    trained with, exactly as the previous pandas pipeline did.
+    """
+
+    def __init__(self, feature_names: List[str]):
+        self.feature_names = list(feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+        self._model_columns: Dict[Tuple[str, ...], np.ndarray] = {}
+
+        self.daily_columns = [(name, self.index[name]) for name in DAILY_FEATURES if name in self.index]
+        self.date_columns = [(name, self.index[name]) for name in DATE_FEATURES if name in self.index]
+        # Column of each weather description's one-hot feature, -1 if the models don't use it
+        self.description_columns = np.array([
+            self.index.get(f"{WEATHER_DESCRIPTION_PREFIX}{description}", -1)
+            for description in WEATHER_DESCRIPTIONS
+        ])
+
+    @classmethod
+    def from_models(cls, models: Dict[str, Any]) -> "FeatureSchema":
+        feature_names = []
+        for model in models.values():
+            feature_names.extend(model.feature_names_in_)
+        return cls(list(dict.fromkeys(feature_names)))
+
+    def columns_for(self, model: Any) -> np.ndarray:
+        """Indices of a model's features in this schema, in the model's order"""
+        key = tuple(model.feature_names_in_)
+        columns = self._model_columns.get(key)
+        if columns is None:
+            columns = np.array([self.index[name] for name in key])
+            self._model_columns[key] = columns
+        return columns
+
+    def build(self, data: Optional[Dict[str, Any]]) -> Optional[WeatherFeatures]:
+        """Fill the feature array for every day of an Open-Meteo daily forecast"""
+        if not data:
+            return None
+
+        daily = data['daily']
+        dates = np.array(daily['time'], dtype='datetime64[D]')
+        X = np.zeros((len(dates), len(self.feature_names)))
+
+        weather = {name: np.array(daily[name], dtype=np.float64) for name in DAILY_FEATURES}
+        for name, column in self.daily_columns:
+            X[:, column] = weather[name]
+
+        if self.date_columns:
+            months = dates.astype('datetime64[M]')
+            date_values = {
+                'month': months.astype(np.int64) % 12 + 1,
+                # 1970-01-01 was a Thursday, Monday is 0
+                'day_of_week': (dates.astype(np.int64) + 3) % 7,
+                'day_of_month': (dates - months).astype(np.int64) + 1,
+            }
+            for name, column in self.date_columns:
+                X[:, column] = date_values[name]
+
+        rain = weather['rain_sum']
+        conditions = [
+            rain > 5.0,
+            (rain > 0.0) & (rain <= 5.0),
+            weather['snowfall_sum'] > 0.0,
+            weather['temperature_2m_mean'] < 0,
+            weather['sunshine_duration'] > 30000,
+            (weather['sunshine_duration'] > 10000) & (weather['sunshine_duration'] <= 30000),
+        ]
+        description = np.select(conditions, range(len(conditions)), default=len(conditions))
+        columns = self.description_columns[description]
+        rows = np.flatnonzero(columns >= 0)
+        X[rows, columns[rows]] = 1
+
+        return WeatherFeatures(dates=dates, X=X, schema=self)
+
+
+_schemas: Dict[Tuple[str, ...], FeatureSchema] = {}
+
+
+def get_feature_schema(models: Dict[str, Any]) -> FeatureSchema:
+    """Get the schema for a set of models, compiling it the first time it is needed"""
+    key = tuple(name for model in models.values() for name in model.feature_names_in_)
+    schema = _schemas.get(key)
+    if schema is None:
+        schema = FeatureSchema.from_models(models)
+        _schemas[key] = schema
+    return schema
@@ -0,0 +1,118 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Forecast, get_uuid
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def save_forecast(db: Session, predictions: "pd.DataFrame", food_items: List[str], model_version: str,
+                  weather_snapshot_id: str):
+    """Replace the precomputed forecast with new predictions in a single transaction
+
+    Args:
+        db: Database session
+        predictions: DataFrame with a 'Date' column and one column per food item
+        food_items: Food item columns to store
+        model_version: Version of the models that made the predictions
+        weather_snapshot_id: Identifier of the weather forecast the predictions were made from
+    """
+    now = datetime.now()
+    rows = [
+        {
+            "id": get_uuid(),
+            "date": forecast_date.date(),
+            "item": item,
+            "predicted_quantity": float(quantity),
+            "model_version": model_version,
+            "weather_snapshot_id": weather_snapshot_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for item in food_items
+        for forecast_date, quantity in zip(predictions["Date"], predictions[item])
+    ]
+    try:
+        db.query(Forecast).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(Forecast), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def stored_forecast_version(db: Session, model_version: str, max_age: float) -> Optional[str]:
+    """Identify the stored forecast load_forecast would return, without reading it
+
+    One indexed query for a single row. save_forecast replaces the whole
+    table with one timestamp, so the weather snapshot and the time it was
+    stored identify its content.
+
+    Returns:
+        The forecast's version, or None if it doesn't start today, is older
+        than max_age seconds or was made by other models
+    """
+    today = date.today()
+    first_date = db.query(func.min(Forecast.date)).scalar_subquery()
+    row = (
+        db.query(Forecast.weather_snapshot_id, Forecast.updated_at)
+        .filter(
+            Forecast.date == today,
+            first_date == today,
+            Forecast.model_version == model_version,
+            Forecast.updated_at >= datetime.now() - timedelta(seconds=max_age)
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    return f"{row.weather_snapshot_id}@{row.updated_at.isoformat()}"
+
+
+def load_forecast(db: Session, food_items: List[str], model_version: str, max_age: float) -> Optional["pd.DataFrame"]:
+    """Read the precomputed forecast, if it starts today
+
+    A single query on the date index reads the rows from today on, made by
+    model_version at most max_age seconds ago, with the first stored date
+    alongside. A forecast saved before midnight is rejected rather than served
+    without its first day, which would give one day fewer than a live forecast.
+
+    Returns:
+        DataFrame shaped like the live predictions, or None if the stored forecast
+        is missing, incomplete, doesn't start today, is older than max_age
+        seconds or was made by other models
+    """
+    today = date.today()
+    first_date = db.query(func.min(Forecast.date)).scalar_subquery()
+    rows = (
+        db.query(Forecast.date, Forecast.item, Forecast.predicted_quantity, first_date.label("first_date"))
+        .filter(
+            Forecast.date >= today,
+            Forecast.model_version == model_version,
+            Forecast.updated_at >= datetime.now() - timedelta(seconds=max_age)
+        )
+        .order_by(Forecast.date)
+        .all()
+    )
+    if not rows or rows[0].first_date != today:
+        return None
+
+    dates = list(dict.fromkeys(row.date for row in rows))
+    quantities = {(row.date, row.item): row.predicted_quantity for row in rows}
+    if any((forecast_date, item) not in quantities for forecast_date in dates for item in food_items):
+        return None
+
+    import pandas as pd
+
+    result_df = pd.DataFrame({"Date": pd.to_datetime(dates)})
+    for item in food_items:
+        result_df[item] = [quantities[(forecast_date, item)] for forecast_date in dates]
+    return result_df
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from app.core.config import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_POOL_SIZE
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Get the process-wide HTTP client, creating it on the running event loop.
+
+    The session keeps a pool of connections open so repeated calls to the same
+    host skip the TCP and TLS handshakes.
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session_loop = loop
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT),
+        )
+    return _session
+
+
+async def close_http_session():
+    global _session, _session_loop
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+    _session_loop = None
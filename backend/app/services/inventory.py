@@ -0,0 +1,59 @@
+from typing import Dict, List, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.db.models import Inventory, Order, RestaurantOrder
+
+
+def get_inventories_with_orders(db: Session, restaurant_ids: List[str]) -> Dict[str, List[Tuple[Inventory, int]]]:
+    """Get the inventory items of several restaurants with the total amount on order for each
+
+    Runs a single query: the inventory LEFT JOINed with each restaurant's order
+    amounts summed per inventory item, so the cost does not grow with a list of
+    order ids.
+
+    Returns:
+        Dictionary mapping restaurant ids to (inventory item, ordered amount)
+        pairs, the ordered amount is 0 for items without orders. Restaurants
+        without inventory are left out.
+    """
+    if not restaurant_ids:
+        return {}
+
+    ordered = (
+        db.query(
+            RestaurantOrder.restaurant_id,
+            Order.inventory_id,
+            func.sum(Order.order_amount).label("ordered_amount")
+        )
+        .select_from(Order)
+        .join(RestaurantOrder, RestaurantOrder.order_id == Order.id)
+        .filter(RestaurantOrder.restaurant_id.in_(restaurant_ids))
+        .group_by(RestaurantOrder.restaurant_id, Order.inventory_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Inventory, func.coalesce(ordered.c.ordered_amount, 0))
+        .outerjoin(ordered, and_(
+            ordered.c.inventory_id == Inventory.id,
+            ordered.c.restaurant_id == Inventory.restaurant_id
+        ))
+        .filter(Inventory.restaurant_id.in_(restaurant_ids))
+        .all()
+    )
+
+    inventories: Dict[str, List[Tuple[Inventory, int]]] = {}
+    for item, ordered_amount in rows:
+        inventories.setdefault(item.restaurant_id, []).append((item, ordered_amount))
+    return inventories
+
+
+def get_inventory_with_orders(db: Session, restaurant_id: str) -> List[Tuple[Inventory, int]]:
+    """Get a restaurant's inventory items with the total amount on order for each, in one query
+
+    Returns:
+        (inventory item, ordered amount) pairs, the ordered amount is 0 for
+        items without orders
+    """
+    return get_inventories_with_orders(db, [restaurant_id]).get(restaurant_id, [])
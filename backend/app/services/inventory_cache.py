@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import INVENTORY_FORECAST_CACHE_SIZE
+from app.db.models import Restaurant
+
+
+class InventoryForecastCache:
+    """Per-restaurant cache of inventory forecast results.
+
+    Entries are keyed by the restaurant's ``data_version`` together with
+    whatever else the result depends on (forecast, recipes, date). Writes that
+    change a restaurant's orders or campaigns call ``bump_restaurant_version``
+    in their transaction, so older entries are never served again by any
+    worker process; they age out of the LRU order.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[Hashable, ...], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Tuple[Hashable, ...], value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+            }
+
+
+def bump_restaurant_version(db: Session, restaurant_id: str):
+    """Mark a restaurant's cached inventory forecasts outdated, committed with the caller's write"""
+    db.query(Restaurant).filter(Restaurant.id == restaurant_id).update(
+        {Restaurant.data_version: Restaurant.data_version + 1}, synchronize_session=False
+    )
+
+
+inventory_forecast_cache = InventoryForecastCache(INVENTORY_FORECAST_CACHE_SIZE)
@@ -0,0 +1,218 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.core.config import MODEL_DIR, MODEL_RELOAD_CHECK_INTERVAL, FORECAST_INFERENCE_ENGINE
+from app.services.tree_engine import CompiledGradientBoosting
+
+logger = logging.getLogger(__name__)
+
+FOOD_ITEMS = ['burger_sales', 'salad_sales', 'pizza_sales', 'ice_cream_sales']
+
+
+@dataclass
+class LoadedModel:
+    """A deserialized model together with the file state it was loaded from"""
+    name: str
+    model: Any
+    path: str
+    mtime_ns: int
+    size: int
+    sha256: str
+    load_seconds: float
+    loaded_at: datetime
+    compiled: Optional[CompiledGradientBoosting] = None
+
+    @property
+    def version(self) -> str:
+        return self.sha256[:12]
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ModelRegistry:
+    """Process-wide cache of the sales forecast models.
+
+    Models are unpickled once and the same instances are handed out to every
+    caller, so they must be treated as read-only. A model file is re-read only
+    when its mtime/size changes and its content hash differs from the loaded one.
+    """
+
+    def __init__(self, model_dir: str, model_names: List[str], check_interval: float = 30.0,
+                 engine: str = "sklearn"):
+        self.model_dir = model_dir
+        self.model_names = list(model_names)
+        self.check_interval = check_interval
+        self.engine = engine
+        self._models: Dict[str, LoadedModel] = {}
+        self._last_checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def model_path(self, name: str) -> str:
+        return os.path.join(self.model_dir, f"{name}_gradientboosting_model.pkl")
+
+    def _load(self, name: str) -> Optional[LoadedModel]:
+        path = self.model_path(name)
+        try:
+            stat = os.stat(path)
+            start = time.perf_counter()
+            # Hash and unpickle the same bytes so version and model always agree
+            with open(path, "rb") as f:
+                data = f.read()
+            sha256 = hashlib.sha256(data).hexdigest()
+            model = pickle.loads(data)
+            compiled = self._compile(name, model) if self.engine == "compiled" else None
+            load_seconds = time.perf_counter() - start
+        except FileNotFoundError:
+            logger.warning(f"Model file {path} not found")
+            return None
+        except Exception as e:
+            logger.error(f"Error loading model {path}: {e}")
+            return None
+
+        loaded = LoadedModel(
+            name=name,
+            model=model,
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            sha256=sha256,
+            load_seconds=load_seconds,
+            loaded_at=datetime.now(),
+            compiled=compiled,
+        )
+        logger.info(f"Loaded model {name} (version {loaded.version}) in {load_seconds * 1000:.1f} ms")
+        return loaded
+
+    @staticmethod
+    def _compile(name: str, model: Any) -> Optional[CompiledGradientBoosting]:
+        try:
+            return CompiledGradientBoosting(model)
+        except Exception as e:
+            logger.warning(f"Could not compile model {name}, falling back to sklearn: {e}")
+            return None
+
+    def load_all(self):
+        """Load every model from disk, replacing anything already loaded"""
+        with self._lock:
+            for name in self.model_names:
+                loaded = self._load(name)
+                self._last_checked[name] = time.monotonic()
+                if loaded is not None:
+                    self._models[name] = loaded
+            self._loaded = True
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            self.load_all()
+
+    def _refresh(self, name: str):
+        """Reload a model if its file changed since it was loaded"""
+        now = time.monotonic()
+        if now - self._last_checked.get(name, 0.0) < self.check_interval:
+            return
+
+        with self._lock:
+            if now - self._last_checked.get(name, 0.0) < self.check_interval:
+                return
+            self._last_checked[name] = now
+
+            current = self._models.get(name)
+            try:
+                stat = os.stat(self.model_path(name))
+            except FileNotFoundError:
+                # Keep serving the last good model if the file disappears
+                return
+
+            if current is not None:
+                if stat.st_mtime_ns == current.mtime_ns and stat.st_size == current.size:
+                    return
+                if _file_sha256(current.path) == current.sha256:
+                    # Touched but not changed
+                    current.mtime_ns = stat.st_mtime_ns
+                    current.size = stat.st_size
+                    return
+
+            loaded = self._load(name)
+            if loaded is not None:
+                self._models[name] = loaded
+
+    def _get_loaded(self, name: str) -> Optional[LoadedModel]:
+        self.ensure_loaded()
+        self._refresh(name)
+        return self._models.get(name)
+
+    def get(self, name: str) -> Optional[Any]:
+        """Get the shared instance of a model, or None if it is unavailable"""
+        loaded = self._get_loaded(name)
+        return loaded.model if loaded else None
+
+    def get_models(self) -> Dict[str, Any]:
+        """Get all available models keyed by food item, in FOOD_ITEMS order"""
+        models = {}
+        for name in self.model_names:
+            model = self.get(name)
+            if model is not None:
+                models[name] = model
+        return models
+
+    def get_predictors(self) -> Dict[str, Any]:
+        """Get the objects to predict with, keyed by food item.
+
+        These are the compiled models when the compiled engine is enabled and
+        the model could be compiled, otherwise the sklearn models. Both expose
+        ``feature_names_in_`` and ``predict``.
+        """
+        predictors = {}
+        for name in self.model_names:
+            loaded = self._get_loaded(name)
+            if loaded is not None:
+                predictors[name] = loaded.compiled if loaded.compiled is not None else loaded.model
+        return predictors
+
+    @property
+    def version(self) -> str:
+        """Combined version of all loaded models, changes whenever any model changes"""
+        self.ensure_loaded()
+        digest = hashlib.sha256()
+        for name in self.model_names:
+            loaded = self._models.get(name)
+            digest.update(f"{name}:{loaded.sha256 if loaded else ''};".encode())
+        return digest.hexdigest()[:12]
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Describe the loaded models for monitoring"""
+        self.ensure_loaded()
+        return [
+            {
+                "name": loaded.name,
+                "version": loaded.version,
+                "sha256": loaded.sha256,
+                "engine": "compiled" if loaded.compiled is not None else "sklearn",
+                "load_seconds": loaded.load_seconds,
+                "loaded_at": loaded.loaded_at,
+            }
+            for loaded in (self._models.get(name) for name in self.model_names)
+            if loaded is not None
+        ]
+
+
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    FOOD_ITEMS,
+    check_interval=MODEL_RELOAD_CHECK_INTERVAL,
+    engine=FORECAST_INFERENCE_ENGINE
+)
@@ -0,0 +1,151 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PromotionMix:
+    """Servings of each menu item to promote, using the excess stock jointly"""
+    quantities: np.ndarray  # Whole servings per menu item
+    value: float  # Objective reached, sum of values times quantities
+    method: str  # "greedy", "lp" (rounded relaxation) or "milp"
+
+
+def max_quantities(amounts: np.ndarray, excess: np.ndarray) -> np.ndarray:
+    """Servings of each menu item the excess stock allows on its own, 0 without ingredients"""
+    ratios = np.divide(excess, amounts, out=np.full(amounts.shape, np.inf), where=amounts > 0)
+    quantities = np.floor(ratios.min(axis=1, initial=np.inf))
+    quantities[~np.isfinite(quantities)] = 0
+    return np.maximum(quantities, 0).astype(np.int64)
+
+
+def _fill(amounts: np.ndarray, remaining: np.ndarray, quantities: np.ndarray, values: np.ndarray,
+          order: np.ndarray) -> np.ndarray:
+    """Add as many servings of each menu item as the remaining stock allows, in order"""
+    for i in order:
+        row = amounts[i]
+        used = row > 0
+        if values[i] <= 0 or not used.any():
+            continue
+        fit = int(np.floor(np.min(remaining[used] / row[used])))
+        if fit > 0:
+            quantities[i] += fit
+            remaining -= fit * row
+    return quantities
+
+
+def greedy_mix(amounts: np.ndarray, excess: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Fill menu items in order of value per share of excess used
+
+    The size of a serving is the sum over its ingredients of the fraction of
+    that ingredient's excess it takes. Menu items are taken in decreasing order
+    of value per size, each as many times as the remaining stock allows.
+    """
+    share = np.divide(amounts, excess, out=np.zeros(amounts.shape), where=excess > 0)
+    size = share.sum(axis=1)
+    efficiency = np.divide(values, size, out=np.zeros(len(values)), where=size > 0)
+    quantities = np.zeros(amounts.shape[0], dtype=np.int64)
+    return _fill(amounts, excess.copy(), quantities, values, np.argsort(-efficiency, kind="stable"))
+
+
+def _constraints(amounts: np.ndarray, excess: np.ndarray):
+    from scipy.sparse import csr_array
+
+    # Ingredients no menu item uses can't constrain anything
+    used = (amounts > 0).any(axis=0)
+    return csr_array(amounts[:, used].T), excess[used]
+
+
+def lp_rounded_mix(amounts: np.ndarray, excess: np.ndarray, values: np.ndarray) -> Optional[np.ndarray]:
+    """Round down the LP relaxation's solution, then fill the stock it leaves
+
+    None if SciPy is unavailable or the LP fails.
+    """
+    try:
+        from scipy.optimize import linprog
+    except ImportError:
+        return None
+
+    A, b = _constraints(amounts, excess)
+    upper = max_quantities(amounts, excess)
+    result = linprog(-values, A_ub=A, b_ub=b, bounds=np.column_stack([np.zeros(len(upper)), upper]), method="highs")
+    if result.x is None:
+        logger.warning(f"Promotion mix LP failed: {result.message}")
+        return None
+
+    quantities = np.floor(result.x + 1e-9).astype(np.int64)
+    remaining = excess - quantities @ amounts
+    if np.any(remaining < -1e-9):
+        return None
+    # Items the relaxation wanted most of a further serving of go first
+    return _fill(amounts, remaining, quantities, values, np.argsort(-(result.x - quantities), kind="stable"))
+
+
+def milp_mix(amounts: np.ndarray, excess: np.ndarray, values: np.ndarray,
+             time_limit: float) -> Optional[np.ndarray]:
+    """Integer program solved with HiGHS, None if SciPy or a solution within the time limit is unavailable"""
+    try:
+        from scipy.optimize import Bounds, LinearConstraint, milp
+    except ImportError:
+        return None
+
+    A, b = _constraints(amounts, excess)
+    result = milp(
+        c=-values,
+        constraints=LinearConstraint(A, -np.inf, b),
+        integrality=np.ones(len(values)),
+        bounds=Bounds(0, max_quantities(amounts, excess)),
+        options={"time_limit": time_limit},
+    )
+    if result.x is None:
+        return None
+    return np.round(result.x).astype(np.int64)
+
+
+def solve_promotion_mix(amounts: np.ndarray, excess: np.ndarray, values: Optional[np.ndarray] = None,
+                        time_limit: float = 0.02) -> PromotionMix:
+    """Choose how many servings of each menu item to promote with shared excess stock
+
+    Maximizes the total value of the servings such that, for every ingredient,
+    the servings together use no more than its excess. The greedy solution is
+    always computed; unless it is already optimal, with SciPy the rounded LP
+    relaxation and, if time_limit allows, the integer program are tried too
+    and the best feasible solution is returned.
+
+    Args:
+        amounts: (menu items, ingredients) amount of each ingredient per serving
+        excess: Excess stock of each ingredient
+        values: Value of one serving of each menu item, 1 by default so the
+            number of servings is maximized
+        time_limit: Seconds the integer program may run, 0 to skip it
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    excess = np.maximum(np.asarray(excess, dtype=np.float64), 0)
+    values = np.ones(amounts.shape[0]) if values is None else np.asarray(values, dtype=np.float64)
+
+    best, method = greedy_mix(amounts, excess, values), "greedy"
+    # Each menu item's stand-alone maximum bounds what any mix can reach, so a
+    # greedy mix reaching it (always the case for a single item) is optimal
+    bound = np.maximum(values, 0) @ max_quantities(amounts, excess) if amounts.size else 0
+    if amounts.shape[0] > 1 and values @ best < bound:
+        candidates = [("lp", lp_rounded_mix(amounts, excess, values))]
+        if time_limit > 0:
+            candidates.append(("milp", milp_mix(amounts, excess, values, time_limit)))
+        for name, quantities in candidates:
+            if (quantities is not None and np.all(quantities >= 0)
+                    and np.all(quantities @ amounts <= excess + 1e-9)
+                    and values @ quantities > values @ best):
+                best, method = quantities, name
+
+    return PromotionMix(quantities=best, value=float(values @ best), method=method)
+
+
+def warm_up_promotion_solver():
+    """Import SciPy's solvers and solve a small mix so the first request does not pay for it"""
+    amounts, excess, values = np.array([[2.0, 1.0], [1.0, 2.0]]), np.array([3.0, 3.0]), np.array([1.0, 1.1])
+    lp_rounded_mix(amounts, excess, values)
+    milp_mix(amounts, excess, values, time_limit=1.0)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import RECIPES_PATH
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngredientLayout:
+    """Ingredients used by a set of menu items, in order of first occurrence"""
+    columns: np.ndarray  # Columns in the RecipeIndex
+    units: List[str]  # Unit of each ingredient's first occurrence
+    menu_names: List[List[str]]  # Display names of the menu items using each ingredient
+
+
+class RecipeIndex:
+    """Recipes compiled into an ingredient vocabulary and a dense amount matrix.
+
+    ``amounts[i, j]`` is the amount of ingredient ``ingredients[j]`` in one
+    serving of menu item ``menu_items[i]``. Ingredients are numbered in order
+    of first occurrence, walking menu items and their ingredients in file
+    order, and each ingredient keeps the unit of its first occurrence.
+    Instances are shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, recipes: Dict[str, Any], version: str = ""):
+        self.recipes = recipes
+        self.version = version
+        self.menu_items: List[str] = list(recipes)
+        self.menu_index = {key: i for i, key in enumerate(self.menu_items)}
+        self.menu_names: List[str] = [recipes[key].get("name", key) for key in self.menu_items]
+
+        self.ingredients: List[str] = []
+        self.units: List[str] = []
+        self.ingredient_index: Dict[str, int] = {}
+        entries = []
+        for row, key in enumerate(self.menu_items):
+            for ingredient in recipes[key].get("ingredients", []):
+                column = self.ingredient_index.get(ingredient["item"])
+                if column is None:
+                    column = len(self.ingredients)
+                    self.ingredient_index[ingredient["item"]] = column
+                    self.ingredients.append(ingredient["item"])
+                    self.units.append(ingredient["unit"])
+                entries.append((row, column, ingredient["amount"]))
+
+        self.amounts = np.zeros((len(self.menu_items), len(self.ingredients)))
+        self.uses = np.zeros(self.amounts.shape, dtype=bool)
+        for row, column, amount in entries:
+            self.amounts[row, column] += amount
+            self.uses[row, column] = True
+        # Products of whole-number amounts and servings are summed exactly in float64
+        self.integral = bool(np.all(np.mod(self.amounts, 1) == 0))
+        self._layouts: Dict[Tuple[str, ...], IngredientLayout] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "RecipeIndex":
+        with open(path, "rb") as f:
+            data = f.read()
+        return cls(json.loads(data), version=hashlib.sha256(data).hexdigest()[:12])
+
+    def __len__(self) -> int:
+        return len(self.menu_items)
+
+    def layout_for(self, menu_keys: List[str]) -> IngredientLayout:
+        """Ingredients of some menu items, walking them in the given order.
+
+        Menu items not in the index are ignored. Layouts are cached per
+        sequence of menu items.
+        """
+        key = tuple(menu_keys)
+        layout = self._layouts.get(key)
+        if layout is not None:
+            return layout
+
+        positions: Dict[str, int] = {}
+        units: List[str] = []
+        menu_names: List[List[str]] = []
+        for menu_key in key:
+            if menu_key not in self.menu_index:
+                continue
+            name = self.menu_names[self.menu_index[menu_key]]
+            for ingredient in self.recipes[menu_key].get("ingredients", []):
+                position = positions.get(ingredient["item"])
+                if position is None:
+                    position = len(units)
+                    positions[ingredient["item"]] = position
+                    units.append(ingredient["unit"])
+                    menu_names.append([])
+                if name not in menu_names[position]:
+                    menu_names[position].append(name)
+
+        layout = IngredientLayout(
+            columns=np.array([self.ingredient_index[item] for item in positions], dtype=np.intp),
+            units=units,
+            menu_names=menu_names,
+        )
+        self._layouts[key] = layout
+        return layout
+
+
+class RecipeRegistry:
+    """Process-wide RecipeIndex for the recipes file.
+
+    The file is parsed once and the index is rebuilt only when the file's
+    mtime or size changes. If a changed file cannot be read, the last good
+    index keeps being served.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: Optional[RecipeIndex] = None
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Optional[RecipeIndex]:
+        """Build the index from the file, replacing the current one"""
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Optional[RecipeIndex]:
+        try:
+            stat = os.stat(self.path)
+        except OSError as e:
+            logger.error(f"Error loading recipes {self.path}: {e}")
+            return self._index
+        try:
+            index = RecipeIndex.from_file(self.path)
+        except Exception as e:
+            logger.error(f"Error loading recipes {self.path}: {e}")
+            if self._index is not None:
+                # Don't retry until the file changes again
+                self._stat = (stat.st_mtime_ns, stat.st_size)
+            return self._index
+        self._index = index
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        logger.info(f"Loaded {len(index)} recipes with {len(index.ingredients)} ingredients (version {index.version})")
+        return index
+
+    def get(self) -> Optional[RecipeIndex]:
+        """Get the current index, rebuilding it first if the file changed"""
+        try:
+            stat = os.stat(self.path)
+            current = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            current = None
+        if self._index is not None and current in (None, self._stat):
+            return self._index
+
+        with self._lock:
+            if self._index is not None and current in (None, self._stat):
+                return self._index
+            return self._load()
+
+
+recipe_registry = RecipeRegistry(RECIPES_PATH)
@@ -0,0 +1,111 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+
+from app.services.recipes import RecipeIndex
+
+
+@dataclass
+class IngredientRequirements:
+    """Ingredients needed to serve a forecast, one column per ingredient"""
+    ingredients: List[str]
+    units: List[str]
+    menu_names: List[List[str]]  # Display names of the menu items using each ingredient
+    daily: np.ndarray  # (days, ingredients) amount needed each day
+    amounts: np.ndarray  # Total amount needed over all days
+
+
+def compute_requirements(index: RecipeIndex, menu_keys: List[str], quantities: np.ndarray) -> IngredientRequirements:
+    """Compute the ingredients needed for forecast sales of some menu items
+
+    Forecast quantities are rounded to whole servings per day and multiplied
+    with the recipe matrix in one product, which is exact for whole-number
+    recipe amounts. Ingredients are ordered by first occurrence in menu_keys
+    order, and menu items without a recipe are ignored.
+
+    Args:
+        index: Recipe index
+        menu_keys: Menu item keys, one per column of quantities
+        quantities: (days, menu items) forecast sales
+
+    Returns:
+        IngredientRequirements for every ingredient of the menu items
+    """
+    known = [i for i, key in enumerate(menu_keys) if key in index.menu_index]
+    keys = [menu_keys[i] for i in known]
+    layout = index.layout_for(keys)
+    rows = np.array([index.menu_index[key] for key in keys], dtype=np.intp)
+
+    # Rounds half to even, like round() on each forecast value
+    servings = np.rint(np.asarray(quantities, dtype=np.float64)[:, known])
+
+    if index.integral:
+        # Multiply with the whole recipe matrix rather than copying out the rows and
+        # columns in use; menu items without sales add exact zeros
+        all_servings = np.zeros((servings.shape[0], len(index.menu_items)))
+        all_servings[:, rows] = servings
+        daily = (all_servings @ index.amounts)[:, layout.columns]
+        amounts = daily.sum(axis=0)
+    else:
+        # Fractional amounts are accumulated menu item by menu item and day by
+        # day, the order the dict-based computation used, so results match exactly
+        daily = np.zeros((servings.shape[0], len(layout.columns)))
+        for i, row in enumerate(rows):
+            daily += servings[:, i:i + 1] * index.amounts[row, layout.columns]
+        amounts = np.zeros(len(layout.columns))
+        for day in daily:
+            amounts += day
+
+    return IngredientRequirements(
+        ingredients=[index.ingredients[column] for column in layout.columns],
+        units=layout.units,
+        menu_names=layout.menu_names,
+        daily=daily,
+        amounts=amounts,
+    )
+
+
+def compare_with_inventory(requirements: IngredientRequirements, available: np.ndarray,
+                           excess_threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Find the ingredients in shortage or in excess
+
+    Args:
+        requirements: Ingredients needed
+        available: Amount of each ingredient in stock or on order
+        excess_threshold: Amount above the requirement to be considered excess
+
+    Returns:
+        The difference between available and required amounts, the indices of
+        shortages (most severe first) and the indices of excesses (largest first).
+        Ties keep ingredient order.
+    """
+    difference = np.asarray(available, dtype=np.float64) - requirements.amounts
+    # Sorted on the whole-number differences that are reported
+    reported = np.trunc(difference)
+    shortages = np.flatnonzero(difference < 0)
+    shortages = shortages[np.argsort(reported[shortages], kind="stable")]
+    excesses = np.flatnonzero(difference > excess_threshold)
+    excesses = excesses[np.argsort(-reported[excesses], kind="stable")]
+    return difference, shortages, excesses
+
+
+def stockout_timeline(requirements: IngredientRequirements, available: np.ndarray,
+                      columns: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Follow the stock of some ingredients day by day
+
+    Args:
+        requirements: Ingredients needed
+        available: Amount of each ingredient in stock or on order
+        columns: Indices of the ingredients to follow
+
+    Returns:
+        The (days, columns) amount left at the end of each day and, per column,
+        the index of the first day it is negative or -1 if it never is
+    """
+    columns = np.asarray(columns, dtype=np.intp)
+    # Accumulated day by day like the total, so the last day matches the difference
+    balances = np.asarray(available, dtype=np.float64)[columns] - np.cumsum(requirements.daily[:, columns], axis=0)
+    negative = balances < 0
+    first_day = np.where(negative.any(axis=0), negative.argmax(axis=0), -1)
+    return balances, first_day
@@ -0,0 +1,36 @@
+import asyncio
+from itertools import islice
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+
+from fastapi.concurrency import run_in_threadpool
+
+T = TypeVar("T")
+
+
+async def run_to_completion(func: Callable[..., T], *args) -> T:
+    """Call func(*args) in the threadpool, letting it finish before a cancellation is raised
+
+    run_in_threadpool returns as soon as the caller is cancelled while the
+    thread goes on, so a session it uses could be used or closed by the
+    caller at the same time. Use this for work on a session the caller keeps.
+    """
+    task = asyncio.ensure_future(run_in_threadpool(func, *args))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        await asyncio.wait((task,))
+        raise
+
+
+async def iterate_in_chunks(rows: Iterator[T], chunk_size: int) -> AsyncIterator[T]:
+    """Yield the items of a blocking iterator, reading chunk_size of them at a time in the threadpool
+
+    Meant for rows streamed from the database, which a thread hop per row
+    would slow down.
+    """
+    while True:
+        chunk = await run_to_completion(list, islice(rows, chunk_size))
+        if not chunk:
+            return
+        for row in chunk:
+            yield row
@@ -0,0 +1,71 @@
+import numpy as np
+from typing import Any
+
+TREE_LEAF = -1
+
+
+class CompiledGradientBoosting:
+    """A GradientBoostingRegressor compiled into flat NumPy node arrays.
+
+    All trees are stored back to back in shared arrays (feature, threshold,
+    children, values) and evaluated together, one tree level per step, which
+    avoids sklearn's per-call validation and per-tree Python overhead for the
+    handful of rows a forecast predicts. Leaves point to themselves so every
+    tree can be stepped the same number of times.
+    """
+
+    def __init__(self, model: Any):
+        if getattr(model, "init_", None) == "zero":
+            baseline = 0.0
+        elif hasattr(getattr(model, "init_", None), "constant_"):
+            baseline = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise ValueError(f"Unsupported init estimator: {model.init_!r}")
+        if model.estimators_.shape[1] != 1:
+            raise ValueError("Only single-output regressors can be compiled")
+
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        node_ids = [np.arange(tree.node_count) for tree in trees]
+
+        is_leaf = np.concatenate([tree.children_left == TREE_LEAF for tree in trees])
+        left = np.concatenate([tree.children_left + offset for tree, offset in zip(trees, offsets)])
+        right = np.concatenate([tree.children_right + offset for tree, offset in zip(trees, offsets)])
+        own = np.concatenate([ids + offset for ids, offset in zip(node_ids, offsets)])
+
+        self.feature_names_in_ = getattr(model, "feature_names_in_", None)
+        self.n_features_in_ = model.n_features_in_
+        self.baseline = baseline
+        self.roots = offsets.astype(np.intp)
+        self.feature = np.where(is_leaf, 0, np.concatenate([tree.feature for tree in trees])).astype(np.intp)
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        # Children interleaved as [left, right] per node, indexed by 2 * node + went_right
+        self.children = np.column_stack([np.where(is_leaf, own, left), np.where(is_leaf, own, right)]).ravel().astype(np.intp)
+        # Leaf values pre-multiplied by the learning rate, as sklearn adds them
+        self.value = model.learning_rate * np.concatenate([tree.value[:, 0, 0] for tree in trees])
+        self.depth = max(tree.max_depth for tree in trees)
+
+    def predict(self, X) -> np.ndarray:
+        """Predict like GradientBoostingRegressor.predict, for a DataFrame or 2D array"""
+        if hasattr(X, "to_numpy"):
+            X = X.to_numpy(dtype=np.float32)
+        # sklearn compares float32 inputs against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        n_rows = X.shape[0]
+        flat_X = X.astype(np.float64).ravel()
+        # Offset of each row in the flattened input
+        row_offsets = np.arange(n_rows) * X.shape[1]
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.depth):
+            # Negated so NaN inputs go right, like sklearn
+            went_right = ~(flat_X.take(row_offsets + self.feature.take(nodes)) <= self.threshold.take(nodes))
+            nodes = self.children.take(2 * nodes + went_right)
+
+        # Accumulate tree by tree, starting from the baseline, in sklearn's order
+        stages = np.empty((len(self.roots) + 1, n_rows))
+        stages[0] = self.baseline
+        stages[1:] = self.value.take(nodes)
+        return stages.sum(axis=0)
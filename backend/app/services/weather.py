@@ -0,0 +1,226 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Set, Tuple
+
+import aiohttp
+
+from app.core.config import (
+    WEATHER_PROVIDER,
+    WEATHER_API_URL,
+    WEATHER_FILE_PATH,
+    WEATHER_CACHE_TTL,
+    WEATHER_STALE_TTL,
+    WEATHER_SNAPSHOT_DIR,
+    WEATHER_MAX_RETRIES
+)
+from app.services.http import get_http_session
+
+logger = logging.getLogger(__name__)
+
+DAILY_VARIABLES = "sunshine_duration,rain_sum,snowfall_sum,temperature_2m_mean"
+
+
+@dataclass
+class WeatherSnapshot:
+    """A daily weather forecast as returned by Open-Meteo"""
+    data: Dict[str, Any]
+    fetched_at: float  # Unix timestamp of the upstream fetch
+    snapshot_id: str  # Content hash, identifies the forecast the predictions were made from
+
+    @classmethod
+    def from_data(cls, data: Dict[str, Any], fetched_at: Optional[float] = None) -> "WeatherSnapshot":
+        digest = hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()[:16]
+        return cls(data=data, fetched_at=fetched_at if fetched_at is not None else time.time(), snapshot_id=digest)
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class WeatherProvider(ABC):
+    """Source of daily weather forecasts for a location"""
+
+    @abstractmethod
+    async def fetch(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        """The forecast in Open-Meteo's JSON shape, or None if it can't be had"""
+
+
+class OpenMeteoProvider(WeatherProvider):
+    """Fetch forecasts from the Open-Meteo API over the shared HTTP client"""
+
+    def __init__(self, url: str = WEATHER_API_URL, max_retries: int = WEATHER_MAX_RETRIES,
+                 backoff: float = 0.5):
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def fetch(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        params = {"latitude": latitude, "longitude": longitude, "daily": DAILY_VARIABLES}
+        session = get_http_session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.get(self.url, params=params) as response:
+                    if response.status == 200:
+                        return await response.json()
+                    logger.error(f"Error fetching weather data: {response.status}")
+                    if response.status < 500:
+                        # Client errors will not succeed on retry
+                        return None
+            except (asyncio.TimeoutError, aiohttp.ClientError) as e:
+                logger.error(f"Exception occurred while fetching weather data: {e!r}")
+            if attempt < self.max_retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return None
+
+
+class FileWeatherProvider(WeatherProvider):
+    """Serve a forecast stored in a local JSON file, for tests and benchmarks"""
+
+    def __init__(self, path: str = WEATHER_FILE_PATH):
+        self.path = path
+
+    async def fetch(self, latitude: float, longitude: float) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading weather file {self.path}: {e}")
+            return None
+
+
+class CachedWeatherProvider:
+    """Cache forecasts from another provider.
+
+    Fresh entries (younger than ``ttl``) are served directly. Entries within the
+    following ``stale_ttl`` seconds are served while a background task fetches a
+    new forecast. Older entries trigger a synchronous fetch but are still served
+    if that fetch fails. The last good forecast for each location is persisted in
+    ``snapshot_dir`` so a cold start can serve it before the first fetch succeeds.
+    Concurrent requests for the same location share a single upstream fetch.
+    """
+
+    def __init__(self, provider: WeatherProvider, ttl: float = 3600, stale_ttl: float = 21600,
+                 snapshot_dir: Optional[str] = None):
+        self.provider = provider
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.snapshot_dir = snapshot_dir
+        self._cache: Dict[Tuple[float, float], WeatherSnapshot] = {}
+        self._inflight: Dict[Tuple[float, float], asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def _key(latitude: float, longitude: float) -> Tuple[float, float]:
+        return (round(latitude, 4), round(longitude, 4))
+
+    def _snapshot_path(self, key: Tuple[float, float]) -> Optional[str]:
+        if not self.snapshot_dir:
+            return None
+        return os.path.join(self.snapshot_dir, f"weather_{key[0]}_{key[1]}.json")
+
+    def _read_snapshot(self, key: Tuple[float, float]) -> Optional[WeatherSnapshot]:
+        path = self._snapshot_path(key)
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                stored = json.load(f)
+            return WeatherSnapshot.from_data(stored["data"], fetched_at=stored["fetched_at"])
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable weather snapshot {path}: {e}")
+            return None
+
+    def _write_snapshot(self, key: Tuple[float, float], snapshot: WeatherSnapshot):
+        path = self._snapshot_path(key)
+        if not path:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"fetched_at": snapshot.fetched_at, "data": snapshot.data}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist weather snapshot {path}: {e}")
+
+    def _store(self, key: Tuple[float, float], data: Dict[str, Any]) -> WeatherSnapshot:
+        snapshot = WeatherSnapshot.from_data(data)
+        self._cache[key] = snapshot
+        self._write_snapshot(key, snapshot)
+        return snapshot
+
+    async def _fetch_and_store(self, latitude: float, longitude: float) -> Optional[WeatherSnapshot]:
+        try:
+            data = await self.provider.fetch(latitude, longitude)
+        except Exception as e:
+            logger.error(f"Weather provider failed: {e!r}")
+            return None
+        if not data or "daily" not in data:
+            return None
+        return self._store(self._key(latitude, longitude), data)
+
+    def _refresh_task(self, latitude: float, longitude: float) -> asyncio.Task:
+        key = self._key(latitude, longitude)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_and_store(latitude, longitude))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def refresh(self, latitude: float, longitude: float) -> Optional[WeatherSnapshot]:
+        """Fetch a new forecast from the provider, returning None if the fetch failed"""
+        # Shield so a cancelled request does not cancel the fetch other requests wait on
+        return await asyncio.shield(self._refresh_task(latitude, longitude))
+
+    def _refresh_in_background(self, latitude: float, longitude: float):
+        task = self._refresh_task(latitude, longitude)
+        # Keep a reference until done, the event loop only holds weak references to tasks
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def get(self, latitude: float, longitude: float) -> Optional[WeatherSnapshot]:
+        """Get the forecast for a location, preferring cached data over an upstream call"""
+        key = self._key(latitude, longitude)
+        snapshot = self._cache.get(key)
+        if snapshot is None:
+            snapshot = self._read_snapshot(key)
+            if snapshot is not None:
+                self._cache[key] = snapshot
+
+        if snapshot is not None and snapshot.age < self.ttl:
+            return snapshot
+
+        if snapshot is not None and snapshot.age < self.ttl + self.stale_ttl:
+            self._refresh_in_background(latitude, longitude)
+            return snapshot
+
+        refreshed = await self.refresh(latitude, longitude)
+        if refreshed is not None:
+            return refreshed
+        if snapshot is not None:
+            logger.warning(f"Serving weather data from {snapshot.age / 3600:.1f} hours ago, upstream unavailable")
+        return snapshot
+
+
+def build_weather_provider() -> CachedWeatherProvider:
+    """Create the weather provider selected by the WEATHER_PROVIDER setting"""
+    if WEATHER_PROVIDER == "file":
+        provider = FileWeatherProvider(WEATHER_FILE_PATH)
+    else:
+        provider = OpenMeteoProvider(WEATHER_API_URL)
+    return CachedWeatherProvider(
+        provider,
+        ttl=WEATHER_CACHE_TTL,
+        stale_ttl=WEATHER_STALE_TTL,
+        snapshot_dir=WEATHER_SNAPSHOT_DIR,
+    )
+
+
+weather_provider = build_weather_provider()
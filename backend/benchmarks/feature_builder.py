@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the NumPy feature builder against the previous pandas pipeline.
+
+Generates random Open-Meteo daily forecasts covering every weather description,
+builds features and predicts with both pipelines and reports time and peak
+allocated memory per call. That both give identical features and predictions
+is checked by tests/test_features.py.
+
+Usage:
+    python -m benchmarks.feature_builder --days 7 16
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.api_v1.endpoints.forecast import process_weather_data, predict_sales
+from app.services.features import get_feature_schema
+from app.services.model_registry import model_registry
+
+
+def legacy_features(data, models) -> pd.DataFrame:
+    """The pandas feature frame process_weather_data replaced, with a 'Date' column"""
+    daily_data = pd.DataFrame()
+    daily_data['Date'] = pd.to_datetime(data['daily']['time'])
+    daily_data['temperature_2m_mean'] = data['daily']['temperature_2m_mean']
+    daily_data['sunshine_duration'] = data['daily']['sunshine_duration']
+    daily_data['rain_sum'] = data['daily']['rain_sum']
+    daily_data['snowfall_sum'] = data['daily']['snowfall_sum']
+    daily_data['month'] = daily_data['Date'].dt.month
+    daily_data['day_of_week'] = daily_data['Date'].dt.dayofweek
+    daily_data['day_of_month'] = daily_data['Date'].dt.day
+    conditions = [
+        (daily_data['rain_sum'] > 5.0),
+        (daily_data['rain_sum'] > 0.0) & (daily_data['rain_sum'] <= 5.0),
+        (daily_data['snowfall_sum'] > 0.0),
+        (daily_data['temperature_2m_mean'] < 0),
+        (daily_data['sunshine_duration'] > 30000),
+        (daily_data['sunshine_duration'] > 10000) & (daily_data['sunshine_duration'] <= 30000)
+    ]
+    choices = ['Rain', 'Light Drizzle', 'Snow', 'Light Snow', 'Sunny', 'Mainly Sunny']
+    daily_data['weather_description'] = np.select(conditions, choices, default='Cloudy')
+    processed_data = pd.get_dummies(daily_data, columns=['weather_description'], drop_first=False)
+
+    required_features = set()
+    for model in models.values():
+        required_features.update(model.feature_names_in_)
+    for feature in required_features - set(processed_data.columns):
+        processed_data[feature] = 0
+    return processed_data
+
+
+def legacy_pipeline(data, models):
+    """The pandas implementation process_weather_data and predict_sales replaced"""
+    processed_data = legacy_features(data, models)
+    result_df = processed_data[['Date']].copy()
+    for item, model in models.items():
+        result_df[item] = model.predict(processed_data[model.feature_names_in_])
+    return result_df
+
+
+def new_pipeline(data, models):
+    return predict_sales(process_weather_data(data, get_feature_schema(models)), models)
+
+
+def random_weather(n_days: int, rng: np.random.Generator) -> dict:
+    start = np.datetime64('2025-01-01') + rng.integers(0, 365)
+    return {
+        "daily": {
+            "time": [str(start + i) for i in range(n_days)],
+            "temperature_2m_mean": rng.uniform(-10, 30, n_days).round(1).tolist(),
+            "sunshine_duration": rng.choice([0.0, 5000.0, 20000.0, 40000.0], n_days).tolist(),
+            "rain_sum": rng.choice([0.0, 0.0, 2.5, 8.0], n_days).tolist(),
+            "snowfall_sum": rng.choice([0.0, 0.0, 0.0, 1.4], n_days).tolist(),
+        }
+    }
+
+
+def measure(pipeline, data, models, number: int):
+    seconds = min(timeit.repeat(lambda: pipeline(data, models), number=number, repeat=3)) / number
+    tracemalloc.start()
+    pipeline(data, models)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the NumPy feature builder with the pandas pipeline")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 16], help="Forecast lengths to time")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    rng = np.random.default_rng(0)
+    models = model_registry.get_models()
+
+    print(f"{'days':>5}{'pandas us':>12}{'numpy us':>11}{'speedup':>9}{'pandas KiB':>12}{'numpy KiB':>11}")
+    for n_days in args.days:
+        data = random_weather(n_days, rng)
+        legacy_s, legacy_peak = measure(legacy_pipeline, data, models, args.number)
+        new_s, new_peak = measure(new_pipeline, data, models, args.number)
+        print(f"{n_days:>5}{legacy_s * 1e6:>12.0f}{new_s * 1e6:>11.0f}{legacy_s / new_s:>8.1f}x"
+              f"{legacy_peak / 1024:>12.1f}{new_peak / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
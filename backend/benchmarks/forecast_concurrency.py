@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+
+"""
+Concurrent-request latency of the forecast path, blocking vs non-blocking.
+
+Starts a local stand-in for Open-Meteo that answers after a configurable delay
+and an API server with two routes:
+
+- /blocking:     the previous implementation, a synchronous HTTP GET and
+                 inline pandas/sklearn work inside an async endpoint
+- /non-blocking: the shared aiohttp client and inference in the threadpool
+
+Both routes call the upstream on every request (no weather cache) so only the
+effect of not blocking the event loop is measured. While the forecasts are in
+flight a cheap /ping route is probed to show how long the event loop stalls.
+
+Usage:
+    python -m benchmarks.forecast_concurrency --requests 50 --upstream-latency 0.3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+import aiohttp
+import uvicorn
+from aiohttp import web
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.core.config import WEATHER_FILE_PATH, FORECAST_LATITUDE, FORECAST_LONGITUDE
+from app.api.api_v1.endpoints.forecast import make_prediction_df_from_weather
+from app.services.model_registry import model_registry
+from app.services.weather import OpenMeteoProvider
+
+
+async def start_upstream(port: int, latency: float) -> web.AppRunner:
+    """Serve the sample weather file after `latency` seconds"""
+    with open(WEATHER_FILE_PATH, "r") as f:
+        body = json.load(f)
+
+    async def forecast(request):
+        await asyncio.sleep(latency)
+        return web.json_response(body)
+
+    upstream = web.Application()
+    upstream.router.add_get("/v1/forecast", forecast)
+    runner = web.AppRunner(upstream)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def build_app(upstream_url: str) -> FastAPI:
+    bench_app = FastAPI()
+    provider = OpenMeteoProvider(upstream_url)
+
+    @bench_app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @bench_app.get("/blocking")
+    async def blocking():
+        # Stands in for the requests.get the endpoint used to make, blocking the event loop the same way
+        query = urllib.parse.urlencode({"latitude": FORECAST_LATITUDE, "longitude": FORECAST_LONGITUDE})
+        with urllib.request.urlopen(f"{upstream_url}?{query}") as response:
+            result = make_prediction_df_from_weather(json.load(response))
+        return {"rows": len(result)}
+
+    @bench_app.get("/non-blocking")
+    async def non_blocking():
+        weather_data = await provider.fetch(FORECAST_LATITUDE, FORECAST_LONGITUDE)
+        result = await run_in_threadpool(make_prediction_df_from_weather, weather_data)
+        return {"rows": len(result)}
+
+    return bench_app
+
+
+def start_api(bench_app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(bench_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def timed_get(session: aiohttp.ClientSession, url: str) -> float:
+    start = time.perf_counter()
+    async with session.get(url) as response:
+        await response.read()
+        response.raise_for_status()
+    return time.perf_counter() - start
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_mode(base_url: str, route: str, n_requests: int) -> dict:
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        # Warm up connections, models and the threadpool
+        await timed_get(session, f"{base_url}/{route}")
+
+        start = time.perf_counter()
+        forecasts = asyncio.gather(*(timed_get(session, f"{base_url}/{route}") for _ in range(n_requests)))
+        await asyncio.sleep(0.01)
+        pings = []
+        while not forecasts.done():
+            pings.append(await timed_get(session, f"{base_url}/ping"))
+            await asyncio.sleep(0.01)
+        latencies = await forecasts
+        wall = time.perf_counter() - start
+
+    return {
+        "route": route,
+        "wall_s": wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "ping_max_ms": max(pings) * 1000 if pings else float("nan"),
+    }
+
+
+async def main_async(args):
+    upstream = await start_upstream(args.upstream_port, args.upstream_latency)
+    upstream_url = f"http://127.0.0.1:{args.upstream_port}/v1/forecast"
+    model_registry.load_all()
+    server = await asyncio.get_running_loop().run_in_executor(None, start_api, build_app(upstream_url), args.api_port)
+    base_url = f"http://127.0.0.1:{args.api_port}"
+
+    try:
+        print(f"{args.requests} concurrent requests, upstream latency {args.upstream_latency * 1000:.0f} ms")
+        print(f"{'route':<14}{'wall s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'ping max ms':>13}")
+        for route in ("blocking", "non-blocking"):
+            r = await run_mode(base_url, route, args.requests)
+            print(f"{r['route']:<14}{r['wall_s']:>9.2f}{r['p50_ms']:>10.0f}{r['p95_ms']:>10.0f}"
+                  f"{r['max_ms']:>10.0f}{r['ping_max_ms']:>13.0f}")
+    finally:
+        server.should_exit = True
+        await upstream.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent forecast latency, blocking vs non-blocking")
+    parser.add_argument("--requests", type=int, default=50, help="Number of concurrent forecast requests")
+    parser.add_argument("--upstream-latency", type=float, default=0.3, help="Seconds the weather stand-in waits")
+    parser.add_argument("--upstream-port", type=int, default=8765)
+    parser.add_argument("--api-port", type=int, default=8766)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
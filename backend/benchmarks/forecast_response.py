@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the columnar forecast response against the default one.
+
+Builds random prediction DataFrames for several horizons and item counts and
+reports, for each response format, the time to build and serialize the
+response and the size of the JSON payload.
+
+Usage:
+    python -m benchmarks.forecast_response --days 7 16 90 --items 5 50 200
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.api.api_v1.endpoints.forecast import build_forecast_items, build_columnar_forecast
+from app.schemas.forecast import ForecastResponse
+
+
+def random_predictions(n_days: int, n_items: int, rng: np.random.Generator):
+    food_items = [f"item_{i}_sales" for i in range(n_items)]
+    columns = {"Date": pd.date_range("2025-01-01", periods=n_days)}
+    columns.update({item: rng.uniform(0, 200, n_days) for item in food_items})
+    return pd.DataFrame(columns), food_items
+
+
+def items_response(results: pd.DataFrame, food_items) -> bytes:
+    # What FastAPI does with a response_model: validate, encode and render
+    response = ForecastResponse(items=build_forecast_items(results, food_items))
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+def columnar_response(results: pd.DataFrame, food_items) -> bytes:
+    return JSONResponse(build_columnar_forecast(results, food_items)).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the default and columnar forecast responses")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 16, 90], help="Forecast horizons")
+    parser.add_argument("--items", type=int, nargs="+", default=[5, 50, 200], help="Food item counts")
+    parser.add_argument("--number", type=int, default=20, help="Calls per timing")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'days':>5}{'items':>7}{'items ms':>10}{'columnar ms':>13}{'speedup':>9}"
+          f"{'items KiB':>11}{'columnar KiB':>14}")
+    for n_days in args.days:
+        for n_items in args.items:
+            results, food_items = random_predictions(n_days, n_items, rng)
+            timings = {}
+            sizes = {}
+            for name, build in (("items", items_response), ("columnar", columnar_response)):
+                seconds = min(timeit.repeat(lambda: build(results, food_items), number=args.number, repeat=3))
+                timings[name] = seconds / args.number
+                sizes[name] = len(build(results, food_items))
+            print(f"{n_days:>5}{n_items:>7}{timings['items'] * 1e3:>10.2f}{timings['columnar'] * 1e3:>13.2f}"
+                  f"{timings['items'] / timings['columnar']:>8.1f}x"
+                  f"{sizes['items'] / 1024:>11.1f}{sizes['columnar'] / 1024:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
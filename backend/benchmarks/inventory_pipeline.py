@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of each stage of the inventory forecast on synthetic data.
+
+Generates recipes, inventory rows, orders and a sales forecast at the given
+sizes and times the stages of get_inventory_forecast without a database: the
+inventory and orders are built in memory in the shape the bulk queries return.
+For every stage it reports the time per call, the throughput and the peak
+memory traced during one call:
+
+- recipes: compiling the recipe index (menu items per second)
+- inventory: building the inventory lookup from rows and ordered amounts (rows per second)
+- requirements: the (days x menu items) by recipe matrix product (menu items per second)
+- summary: shortages, excesses and their stockout timelines (ingredients per second)
+- recommendations: promotion recommendations and their shared mix (excesses per second)
+- forecast: one restaurant's whole inventory forecast, as the endpoint builds it (restaurants per second)
+- serialize: the forecast response as JSON (restaurants per second)
+
+Only the menu items the models forecast (burger, salad, pizza, ice cream) are
+promoted and served by the endpoint, so the recommendations and forecast
+stages grow with the inventory rather than with the menu.
+
+With --save-baseline the results are written to a JSON file. With --baseline
+they are compared against such a file and the script exits with status 1 if
+any stage is more than --tolerance times slower or uses more than --tolerance
+times the memory of the baseline.
+
+Usage:
+    python -m benchmarks.inventory_pipeline --menu-items 4 100 1000 --ingredients 5000 --orders 20000
+    python -m benchmarks.inventory_pipeline --save-baseline /tmp/inventory_pipeline.json
+    python -m benchmarks.inventory_pipeline --baseline /tmp/inventory_pipeline.json --tolerance 1.5
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.api_v1.endpoints.inventory_forecast import (
+    EXCESS_THRESHOLD,
+    MENU_ITEM_NAMES,
+    build_current_inventory,
+    build_inventory_forecast,
+    build_inventory_summary,
+    build_promotion_recommendations,
+)
+from app.db.models import Inventory
+from app.services.model_registry import FOOD_ITEMS
+from app.services.recipes import RecipeIndex
+from app.services.requirements import compute_requirements
+
+
+def synthetic_data(n_menu_items: int, n_ingredients: int, n_orders: int, n_days: int, per_recipe: int,
+                   rng: np.random.Generator):
+    """Recipes, inventory rows with ordered amounts and a sales forecast
+
+    The first menu items are the ones the models forecast, so the endpoint's
+    stages have something to serve and promote.
+    """
+    ingredients = [f"ingredient {i}" for i in range(n_ingredients)]
+    units = rng.choice(["grams", "ml", "piece"], n_ingredients)
+    menu_keys = (FOOD_ITEMS + [f"menu_{m}_sales" for m in range(n_menu_items)])[:max(n_menu_items, len(FOOD_ITEMS))]
+
+    recipes = {}
+    for menu_key in menu_keys:
+        chosen = rng.choice(n_ingredients, size=min(per_recipe, n_ingredients), replace=False)
+        recipes[menu_key] = {
+            "name": MENU_ITEM_NAMES.get(menu_key, menu_key),
+            "ingredients": [
+                {"item": ingredients[i], "amount": int(a), "unit": str(units[i])}
+                for i, a in zip(chosen, rng.integers(1, 200, len(chosen)))
+            ],
+        }
+
+    columns = {"Date": pd.date_range(date.today(), periods=n_days)}
+    columns.update({key: rng.uniform(0, 100, n_days) for key in menu_keys})
+    forecast_df = pd.DataFrame(columns)
+
+    # Stock 50% to 150% of the expected need so both shortages and excesses occur,
+    # and three times as much for the promoted menu items so they are recommended
+    expected = np.zeros(n_ingredients)
+    promoted = np.zeros(n_ingredients, dtype=bool)
+    for key in menu_keys:
+        for ingredient in recipes[key]["ingredients"]:
+            i = int(ingredient["item"].split()[1])
+            expected[i] += ingredient["amount"] * 50 * n_days
+            promoted[i] |= key in MENU_ITEM_NAMES
+    stock = expected * rng.uniform(0.5, 1.5, n_ingredients) + EXCESS_THRESHOLD
+    stock[promoted] = expected[promoted] * 3 + EXCESS_THRESHOLD
+
+    # Orders are summed per inventory row, as the bulk query does
+    ordered = np.bincount(
+        rng.integers(0, n_ingredients, n_orders), weights=rng.integers(1, 100, n_orders), minlength=n_ingredients
+    ).astype(np.int64)
+    rows = [
+        (Inventory(item=name, amount=int(amount), unit=str(unit)), int(ordered_amount))
+        for name, amount, unit, ordered_amount in zip(ingredients, stock - ordered, units, ordered)
+    ]
+    return recipes, menu_keys, forecast_df, rows
+
+
+def measure(call, number: int):
+    seconds = min(timeit.repeat(call, number=number, repeat=3)) / number
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def run_stages(recipes, menu_keys, forecast_df, rows, number: int):
+    """Time every stage, yielding its name, the units it processed, seconds per call and peak bytes"""
+    today = date.today().isoformat()
+    index = RecipeIndex(recipes)
+    current_inventory = build_current_inventory(rows)
+    quantities = forecast_df[menu_keys].to_numpy()
+    summary = build_inventory_summary(forecast_df, index, current_inventory, menu_keys)
+    response = build_inventory_forecast("restaurant", "Restaurant", current_inventory, forecast_df, index, set(), today)
+    n_ingredients = len(summary.shortages) + len(summary.excesses)
+
+    stages = [
+        ("recipes", len(menu_keys), lambda: RecipeIndex(recipes)),
+        ("inventory", len(rows), lambda: build_current_inventory(rows)),
+        ("requirements", len(menu_keys), lambda: compute_requirements(index, menu_keys, quantities)),
+        ("summary", n_ingredients, lambda: build_inventory_summary(forecast_df, index, current_inventory, menu_keys)),
+        ("recommendations", len(summary.excesses),
+         lambda: build_promotion_recommendations(summary.excesses, index, set(), today)),
+        ("forecast", 1, lambda: build_inventory_forecast(
+            "restaurant", "Restaurant", current_inventory, forecast_df, index, set(), today
+        )),
+        ("serialize", 1, lambda: response.model_dump_json()),
+    ]
+    for name, units, call in stages:
+        seconds, peak = measure(call, number)
+        yield name, units, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the inventory forecast on synthetic data")
+    parser.add_argument("--menu-items", type=int, nargs="+", default=[4, 100, 1000], help="Menu sizes")
+    parser.add_argument("--ingredients", type=int, default=5000, help="Inventory rows, one per ingredient")
+    parser.add_argument("--orders", type=int, default=20000, help="Orders spread over the inventory")
+    parser.add_argument("--per-recipe", type=int, default=20, help="Ingredients per recipe")
+    parser.add_argument("--days", type=int, default=7, help="Forecast days")
+    parser.add_argument("--number", type=int, default=5, help="Calls per timing")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save-baseline", help="Write the results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=2.0, help="Allowed factor over the baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    rng = np.random.default_rng(0)
+    results = {}
+    regressions = []
+    print(f"{'menu':>6}{'stage':>17}{'ms':>10}{'per second':>13}{'peak KiB':>11}{'baseline ms':>13}")
+    for n_menu_items in args.menu_items:
+        recipes, menu_keys, forecast_df, rows = synthetic_data(
+            n_menu_items, args.ingredients, args.orders, args.days, args.per_recipe, rng
+        )
+        size = f"{n_menu_items}x{args.ingredients}x{args.days}"
+        results[size] = {}
+        for stage, units, seconds, peak in run_stages(recipes, menu_keys, forecast_df, rows, args.number):
+            results[size][stage] = {"ms": seconds * 1e3, "peak_kib": peak / 1024}
+            reference = baseline.get(size, {}).get(stage)
+            print(f"{n_menu_items:>6}{stage:>17}{seconds * 1e3:>10.2f}{units / seconds:>13,.0f}{peak / 1024:>11.0f}"
+                  f"{reference['ms'] if reference else float('nan'):>13.2f}")
+            if reference is None:
+                continue
+            if seconds * 1e3 > reference["ms"] * args.tolerance:
+                regressions.append(f"{size} {stage}: {seconds * 1e3:.2f} ms vs {reference['ms']:.2f} ms")
+            if peak / 1024 > reference["peak_kib"] * args.tolerance:
+                regressions.append(f"{size} {stage}: {peak / 1024:.0f} KiB vs {reference['peak_kib']:.0f} KiB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        print("Results: within tolerance" if not regressions else "Results: REGRESSED")
+    return not regressions
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
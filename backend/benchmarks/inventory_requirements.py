@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the vectorized ingredient requirements against the dict-based loops.
+
+Generates a synthetic menu, recipes, inventory and sales forecast, computes the
+inventory forecast summary (shortages and excesses) with both implementations
+and reports the time per call. That both give identical results is checked by
+tests/test_requirements.py.
+
+Usage:
+    python -m benchmarks.inventory_requirements --menu-items 4 100 1000 --ingredients 5000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.api.api_v1.endpoints.inventory_forecast import build_inventory_summary, EXCESS_THRESHOLD
+from app.schemas.inventory_forecast import InventoryForecastItem, InventoryForecastSummary
+from app.services.recipes import RecipeIndex
+
+
+def calculate_required_ingredients(menu_items, recipes):
+    """The per-day requirement computation build_inventory_summary replaced"""
+    required_ingredients = {}
+
+    for menu_item, quantity in menu_items.items():
+        if menu_item not in recipes:
+            continue
+
+        for ingredient in recipes[menu_item]["ingredients"]:
+            item_name = ingredient["item"]
+            required_amount = ingredient["amount"] * quantity
+            unit = ingredient["unit"]
+
+            if item_name not in required_ingredients:
+                required_ingredients[item_name] = {
+                    "amount": required_amount,
+                    "unit": unit,
+                    "menu_items": [recipes[menu_item]["name"]]
+                }
+            else:
+                required_ingredients[item_name]["amount"] += required_amount
+                if recipes[menu_item]["name"] not in required_ingredients[item_name]["menu_items"]:
+                    required_ingredients[item_name]["menu_items"].append(recipes[menu_item]["name"])
+
+    return required_ingredients
+
+
+def legacy_requirements(forecast_df, recipes, menu_keys):
+    """The total requirements get_inventory_forecast summed day by day"""
+    total_requirements = {}
+    for _, row in forecast_df.iterrows():
+        daily_menu_items = {key: round(row[key]) for key in menu_keys}
+        daily_required = calculate_required_ingredients(daily_menu_items, recipes)
+        for item_name, required in daily_required.items():
+            if item_name in total_requirements:
+                total_requirements[item_name]["amount"] += required["amount"]
+            else:
+                total_requirements[item_name] = required.copy()
+    return total_requirements
+
+
+def legacy_summary(forecast_df, recipes, current_inventory, menu_keys):
+    """The loops get_inventory_forecast used, generalized from four menu items to menu_keys"""
+    total_requirements = legacy_requirements(forecast_df, recipes, menu_keys)
+
+    shortage_items = []
+    excess_items = []
+    for item_name, required in total_requirements.items():
+        current_amount = 0
+        if item_name in current_inventory:
+            current_amount = current_inventory[item_name]["amount"]
+        difference = current_amount - required["amount"]
+        ordered_amount = current_inventory[item_name].get("ordered", 0)
+        forecast_item = InventoryForecastItem(
+            item=item_name,
+            current_amount=current_amount,
+            required_amount=int(required["amount"]),
+            difference=int(difference),
+            unit=required["unit"],
+            menu_items=required["menu_items"],
+            ordered_amount=ordered_amount
+        )
+        if difference < 0:
+            shortage_items.append(forecast_item)
+        elif difference > EXCESS_THRESHOLD:
+            excess_items.append(forecast_item)
+    shortage_items.sort(key=lambda x: x.difference)
+    excess_items.sort(key=lambda x: -x.difference)
+    return InventoryForecastSummary(shortages=shortage_items, excesses=excess_items)
+
+
+def synthetic_data(n_menu_items: int, n_ingredients: int, n_days: int, per_recipe: int, fractional: bool,
+                   rng: np.random.Generator):
+    ingredients = [f"ingredient {i}" for i in range(n_ingredients)]
+    units = rng.choice(["grams", "ml", "piece"], n_ingredients)
+    recipes = {}
+    for m in range(n_menu_items):
+        chosen = rng.choice(n_ingredients, size=min(per_recipe, n_ingredients), replace=False)
+        amounts = rng.integers(1, 200, len(chosen)).astype(float)
+        if fractional:
+            amounts = np.round(amounts / 8, 1)
+        recipes[f"menu_{m}_sales"] = {
+            "name": f"Menu {m}",
+            "ingredients": [
+                {"item": ingredients[i], "amount": float(a) if fractional else int(a), "unit": str(units[i])}
+                for i, a in zip(chosen, amounts)
+            ],
+        }
+    menu_keys = list(recipes)
+    columns = {"Date": pd.date_range("2025-01-01", periods=n_days)}
+    # Quarter values so half-way cases exercise the rounding
+    columns.update({key: rng.integers(0, 400, n_days) / 4 for key in menu_keys})
+    forecast_df = pd.DataFrame(columns)
+
+    # Scale stock to the expected need so both shortages and excesses occur
+    expected = np.zeros(n_ingredients)
+    for key in menu_keys:
+        for ingredient in recipes[key]["ingredients"]:
+            expected[int(ingredient["item"].split()[1])] += ingredient["amount"] * 50 * n_days
+    current_inventory = {}
+    for i, name in enumerate(ingredients):
+        ordered = int(rng.integers(0, 50))
+        current_inventory[name] = {
+            "amount": int(expected[i] * rng.uniform(0.5, 1.5)) + ordered,
+            "unit": str(units[i]),
+            "ordered": ordered,
+        }
+    return recipes, menu_keys, forecast_df, current_inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare vectorized and dict-based ingredient requirements")
+    parser.add_argument("--menu-items", type=int, nargs="+", default=[4, 100, 1000], help="Menu sizes")
+    parser.add_argument("--ingredients", type=int, default=5000, help="Ingredients in the vocabulary")
+    parser.add_argument("--per-recipe", type=int, default=20, help="Ingredients per recipe")
+    parser.add_argument("--days", type=int, default=7, help="Forecast days")
+    parser.add_argument("--fractional", action="store_true", help="Use fractional recipe amounts")
+    parser.add_argument("--number", type=int, default=3, help="Calls per timing")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'menu':>6}{'ingredients':>13}{'dict ms':>10}{'numpy ms':>10}{'speedup':>9}")
+    for n_menu_items in args.menu_items:
+        recipes, menu_keys, forecast_df, current_inventory = synthetic_data(
+            n_menu_items, args.ingredients, args.days, args.per_recipe, args.fractional, rng
+        )
+        index = RecipeIndex(recipes)
+
+        legacy_s = min(timeit.repeat(
+            lambda: legacy_summary(forecast_df, recipes, current_inventory, menu_keys), number=args.number, repeat=3
+        )) / args.number
+        new_s = min(timeit.repeat(
+            lambda: build_inventory_summary(forecast_df, index, current_inventory, menu_keys), number=args.number, repeat=3
+        )) / args.number
+        used = len(index.layout_for(menu_keys).columns)
+        print(f"{n_menu_items:>6}{used:>13}{legacy_s * 1e3:>10.1f}{new_s * 1e3:>10.1f}{legacy_s / new_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the promotion mix solver across menu sizes.
+
+Generates synthetic menus whose recipes share ingredients, with random excess
+stock, and reports for each menu size the time and objective of the greedy
+solution, of the rounded LP relaxation and of the full solver (best of those and
+the integer program within its time limit), the LP relaxation bound, and the objective of summing each item's stand-alone potential quantity,
+which double-counts shared stock. Every solution is checked to be feasible.
+
+Exits with status 1 if a solution uses more stock than is in excess.
+
+Usage:
+    python -m benchmarks.promotion_solver --menu-items 4 50 200 500 --ingredients 2000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scipy.optimize import linprog
+
+from app.services.promotion_solver import greedy_mix, lp_rounded_mix, max_quantities, solve_promotion_mix
+
+
+def synthetic_menu(n_menu_items: int, n_ingredients: int, per_recipe: int, rng: np.random.Generator):
+    amounts = np.zeros((n_menu_items, n_ingredients))
+    # Popular ingredients are drawn more often, so recipes compete for them
+    popularity = 1 / np.arange(1, n_ingredients + 1)
+    popularity /= popularity.sum()
+    for i in range(n_menu_items):
+        chosen = rng.choice(n_ingredients, size=min(per_recipe, n_ingredients), replace=False, p=popularity)
+        amounts[i, chosen] = rng.integers(1, 150, len(chosen))
+    excess = rng.integers(500, 20000, n_ingredients).astype(float)
+    return amounts, excess
+
+
+def lp_bound(amounts: np.ndarray, excess: np.ndarray) -> float:
+    used = (amounts > 0).any(axis=0)
+    upper = max_quantities(amounts, excess)
+    result = linprog(-np.ones(amounts.shape[0]), A_ub=amounts[:, used].T, b_ub=excess[used],
+                     bounds=np.column_stack([np.zeros(len(upper)), upper]))
+    return -result.fun
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the promotion mix solver across menu sizes")
+    parser.add_argument("--menu-items", type=int, nargs="+", default=[4, 50, 200, 500], help="Menu sizes")
+    parser.add_argument("--ingredients", type=int, default=2000, help="Ingredients in the vocabulary")
+    parser.add_argument("--per-recipe", type=int, default=10, help="Ingredients per recipe")
+    parser.add_argument("--time-limit", type=float, default=0.02, help="Seconds the integer program may run")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    feasible = True
+    print(f"{'menu':>6}{'greedy ms':>11}{'greedy':>8}{'LP ms':>8}{'LP':>7}{'solver ms':>11}{'solver':>8}"
+          f"{'method':>8}{'bound':>9}{'stand-alone':>13}")
+    for n_menu_items in args.menu_items:
+        amounts, excess = synthetic_menu(n_menu_items, args.ingredients, args.per_recipe, rng)
+        values = np.ones(n_menu_items)
+
+        greedy, greedy_s = timed(greedy_mix, amounts, excess, values)
+        rounded, rounded_s = timed(lp_rounded_mix, amounts, excess, values)
+        mix, mix_s = timed(solve_promotion_mix, amounts, excess, time_limit=args.time_limit)
+        for quantities in (greedy, rounded, mix.quantities):
+            if np.any(quantities @ amounts > excess + 1e-9):
+                feasible = False
+
+        print(f"{n_menu_items:>6}{greedy_s * 1e3:>11.2f}{int(greedy.sum()):>8}{rounded_s * 1e3:>8.2f}"
+              f"{int(rounded.sum()):>7}{mix_s * 1e3:>11.2f}{int(mix.value):>8}{mix.method:>8}"
+              f"{lp_bound(amounts, excess):>9.1f}{int(max_quantities(amounts, excess).sum()):>13}")
+
+    print("Solutions: feasible" if feasible else "Solutions: INFEASIBLE")
+    return feasible
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
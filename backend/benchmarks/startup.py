@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the API's startup time.
+
+Starts fresh interpreters and measures, for each run:
+- import: time to import app.main, and which ML libraries that pulled in
+- warm-up: model loading and the warm-up prediction done at startup
+- ready: import plus warm-up, the time until the app can serve forecasts
+  (database initialization excluded)
+- first forecast: latency of the first forecast computation after a warm-up,
+  and without one, when it has to load the models and the ML stack itself
+
+Weather is read from WEATHER_FILE_PATH so no network access is needed.
+
+Usage:
+    python -m benchmarks.startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+CHILD = """
+import json, os, sys, time
+with open(os.environ["WEATHER_FILE_PATH"]) as f:
+    weather_data = json.load(f)
+
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+lazy = [name for name in ("pandas", "sklearn", "scipy") if name in sys.modules]
+
+from app.api.api_v1.endpoints.forecast import make_prediction_df_from_weather, warm_up_forecast
+from app.services.model_registry import model_registry
+
+if {warm_up}:
+    # What the lifespan does at startup
+    model_registry.load_all()
+    warm_up_forecast()
+ready = time.perf_counter()
+make_prediction_df_from_weather(weather_data)
+first = time.perf_counter()
+print(json.dumps({{
+    "import": imported - started,
+    "warm_up": ready - imported,
+    "ready": ready - started,
+    "first_forecast": first - ready,
+    "loaded": lazy,
+}}))
+"""
+
+
+def run_child(warm_up: bool) -> dict:
+    env = dict(os.environ, WEATHER_PROVIDER="file", FORECAST_REFRESH_INTERVAL="0")
+    env.setdefault("WEATHER_FILE_PATH", os.path.join(BACKEND_DIR, "app", "data", "sample_weather.json"))
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD.format(warm_up=warm_up)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and time-to-first-ready of the API")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per configuration")
+    args = parser.parse_args()
+
+    for warm_up in (True, False):
+        runs = [run_child(warm_up) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs) for key in ("import", "warm_up", "ready", "first_forecast")}
+        print(f"{'with' if warm_up else 'without'} warm-up (median of {args.runs} runs)")
+        print(f"  import app.main   {median['import'] * 1e3:8.0f} ms  (ML libraries loaded: {', '.join(runs[0]['loaded']) or 'none'})")
+        print(f"  model load/warm-up{median['warm_up'] * 1e3:8.0f} ms")
+        print(f"  ready             {median['ready'] * 1e3:8.0f} ms")
+        print(f"  first forecast    {median['first_forecast'] * 1e3:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
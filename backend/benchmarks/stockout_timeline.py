@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""
+Benchmark of the cumulative-sum stockout timeline against a per-day loop.
+
+Generates random daily ingredient requirements and stock for several horizons
+and ingredient counts, computes the amount left at the end of each day and the
+first stockout day with both implementations, checks they are identical and
+reports the time per call.
+
+Exits with status 1 if the results differ.
+
+Usage:
+    python -m benchmarks.stockout_timeline --days 7 90 365 --ingredients 100 5000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.requirements import IngredientRequirements, stockout_timeline
+
+
+def loop_timeline(daily, available, columns):
+    """Walk the days one by one for each ingredient"""
+    balances = []
+    first_days = []
+    for column in columns:
+        balance = float(available[column])
+        first_day = -1
+        column_balances = []
+        for day, required in enumerate(daily[:, column]):
+            balance -= required
+            column_balances.append(balance)
+            if balance < 0 and first_day < 0:
+                first_day = day
+        balances.append(column_balances)
+        first_days.append(first_day)
+    return np.array(balances).T.reshape(len(daily), len(columns)), np.array(first_days)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the cumulative-sum and per-day stockout timelines")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 90, 365], help="Forecast horizons")
+    parser.add_argument("--ingredients", type=int, nargs="+", default=[100, 5000], help="Ingredient counts")
+    parser.add_argument("--number", type=int, default=3, help="Calls per timing")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    identical = True
+    print(f"{'days':>5}{'ingredients':>13}{'loop ms':>10}{'cumsum ms':>11}{'speedup':>9}{'stockouts':>11}")
+    for n_days in args.days:
+        for n_ingredients in args.ingredients:
+            daily = np.rint(rng.uniform(0, 100, (n_days, n_ingredients)))
+            # Stock for 50% to 150% of the horizon so some ingredients run out
+            available = np.rint(daily.sum(axis=0) * rng.uniform(0.5, 1.5, n_ingredients))
+            requirements = IngredientRequirements(
+                ingredients=[f"ingredient {i}" for i in range(n_ingredients)],
+                units=["grams"] * n_ingredients,
+                menu_names=[[] for _ in range(n_ingredients)],
+                daily=daily,
+                amounts=daily.sum(axis=0),
+            )
+            columns = np.arange(n_ingredients)
+
+            loop_balances, loop_days = loop_timeline(daily, available, columns)
+            balances, first_days = stockout_timeline(requirements, available, columns)
+            if not (np.array_equal(loop_balances, balances) and np.array_equal(loop_days, first_days)):
+                identical = False
+
+            loop_s = min(timeit.repeat(
+                lambda: loop_timeline(daily, available, columns), number=args.number, repeat=3
+            )) / args.number
+            cumsum_s = min(timeit.repeat(
+                lambda: stockout_timeline(requirements, available, columns), number=args.number, repeat=3
+            )) / args.number
+            print(f"{n_days:>5}{n_ingredients:>13}{loop_s * 1e3:>10.2f}{cumsum_s * 1e3:>11.3f}"
+                  f"{loop_s / cumsum_s:>8.0f}x{int((first_days >= 0).sum()):>11}")
+
+    print("Results: identical" if identical else "Results: DIFFERENT")
+    return identical
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+
+"""
+Micro-benchmark of the compiled tree engine against sklearn.
+
+For every forecast model, predicts random feature rows drawn around the split
+thresholds with both GradientBoostingRegressor.predict and
+CompiledGradientBoosting.predict and reports the time per call for several
+batch sizes. Their parity is checked by tests/test_tree_engine.py.
+
+Usage:
+    python -m benchmarks.tree_inference --rows 1 7 16 100 1000
+"""
+
+import argparse
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.services.model_registry import model_registry
+from app.services.tree_engine import CompiledGradientBoosting
+
+
+def random_rows(model, n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    """Random inputs spanning each feature's split thresholds, so every branch is taken"""
+    columns = {}
+    for index, name in enumerate(model.feature_names_in_):
+        thresholds = np.concatenate([
+            tree.threshold[tree.feature == index] for tree in (e.tree_ for e in model.estimators_[:, 0])
+        ])
+        low, high = (thresholds.min() - 1, thresholds.max() + 1) if thresholds.size else (0.0, 1.0)
+        columns[name] = rng.uniform(low, high, n_rows)
+    return pd.DataFrame(columns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare compiled tree inference with sklearn")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 7, 16, 100, 1000], help="Batch sizes to time")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+
+    print(f"{'model':<18}{'rows':>6}{'sklearn us':>12}{'compiled us':>13}{'speedup':>9}")
+    for name, model in model_registry.get_models().items():
+        compiled = CompiledGradientBoosting(model)
+
+        X = random_rows(model, max(args.rows), rng)
+        for n_rows in args.rows:
+            batch = X.iloc[:n_rows]
+            number = max(10, 2000 // max(1, n_rows // 10))
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                sklearn_s = min(timeit.repeat(lambda: model.predict(batch), number=number, repeat=3)) / number
+            compiled_s = min(timeit.repeat(lambda: compiled.predict(batch), number=number, repeat=3)) / number
+            print(f"{name:<18}{n_rows:>6}{sklearn_s * 1e6:>12.1f}{compiled_s * 1e6:>13.1f}{sklearn_s / compiled_s:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+"""
+Local stand-in for the webhook generating campaign messages.
+
+Answers every request after --latency seconds, plus up to --jitter seconds at
+random, with --body where {name} is replaced by the request's Customer_name.
+A fraction --error-rate of the requests get a 503 instead, which the campaign
+sends retry. Point the API at it with CAMPAIGN_WEBHOOK_URL to run campaigns
+without the external webhook; benchmarks.campaign_throughput starts one
+in-process.
+
+Usage:
+    python -m benchmarks.webhook_stub --port 8787 --latency 0.05 --error-rate 0.01
+    CAMPAIGN_WEBHOOK_URL=http://127.0.0.1:8787/webhook uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Optional
+
+from aiohttp import web
+
+DEFAULT_BODY = '[{"output": "Hi {name}! Enjoy 20% off your next meal this week, we have plenty of fresh ingredients waiting for you."}]'
+
+
+class WebhookStub:
+    """Serve generated messages with a configurable delay, error rate and body"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 body: str = DEFAULT_BODY, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.body = body
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.calls += 1
+        payload = await request.json()
+        await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503)
+        # Escaped so the name can't break a JSON body
+        name = json.dumps(str(payload.get("Customer_name", "")))[1:-1]
+        return web.Response(text=self.body.replace("{name}", name), content_type="application/json")
+
+    async def start(self, host: str, port: int) -> web.AppRunner:
+        """Serve on http://host:port/webhook until the returned runner is cleaned up"""
+        app = web.Application()
+        app.router.add_route("*", "/webhook", self.handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+async def serve(stub: WebhookStub, host: str, port: int):
+    runner = await stub.start(host, port)
+    print(f"Serving http://{host}:{port}/webhook")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+        print(f"{stub.calls} calls, {stub.errors} errors")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the campaign message webhook")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8787, help="Port to listen on")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra seconds, up to this many")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument("--body", default=DEFAULT_BODY, help="Response body, {name} is the customer's name")
+    parser.add_argument("--seed", type=int, help="Seed of the latency and error draws")
+    args = parser.parse_args()
+
+    stub = WebhookStub(args.latency, args.jitter, args.error_rate, args.body, args.seed)
+    try:
+        asyncio.run(serve(stub, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""
+Write the inventory forecast of every restaurant as newline-delimited JSON.
+
+Each line is an InventoryForecastResponse, the same as the
+/api/v1/inventory-forecast/fleet endpoint streams.
+
+Usage:
+    python export_inventory_forecast.py --output inventory_forecast.ndjson
+"""
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.api.api_v1.endpoints.forecast import get_forecast_df
+from app.api.api_v1.endpoints.inventory_forecast import FLEET_CHUNK_SIZE, iter_fleet_inventory_forecasts
+from app.db.session import SessionLocal
+from app.services.http import close_http_session
+from app.services.recipes import recipe_registry
+
+
+async def load_forecast():
+    db = SessionLocal()
+    try:
+        return await get_forecast_df(db)
+    finally:
+        db.close()
+        await close_http_session()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the inventory forecast of every restaurant as NDJSON")
+    parser.add_argument("--output", help="File to write to, defaults to stdout")
+    parser.add_argument("--chunk-size", type=int, default=FLEET_CHUNK_SIZE, help="Restaurants loaded per batch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    forecast_df = asyncio.run(load_forecast())
+    if forecast_df is None or forecast_df.empty:
+        print("No forecast data available", file=sys.stderr)
+        return 1
+    recipe_index = recipe_registry.get()
+    if recipe_index is None or not recipe_index.recipes:
+        print("Could not load recipes data", file=sys.stderr)
+        return 1
+
+    output = open(args.output, "w") if args.output else sys.stdout
+    db = SessionLocal()
+    try:
+        count = 0
+        for forecast in iter_fleet_inventory_forecasts(db, forecast_df, recipe_index, args.chunk_size):
+            output.write(forecast.model_dump_json() + "\n")
+            count += 1
+    finally:
+        db.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Wrote inventory forecasts for {count} restaurants", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
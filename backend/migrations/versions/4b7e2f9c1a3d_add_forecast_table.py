@@ -0,0 +1,42 @@
+"""add_forecast_table
+
+Revision ID: 4b7e2f9c1a3d
+Revises: 8782240cd1cb
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b7e2f9c1a3d'
+down_revision: Union[str, None] = '8782240cd1cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('forecast',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('item', sa.String(length=255), nullable=False),
+    sa.Column('predicted_quantity', sa.Float(), nullable=False),
+    sa.Column('model_version', sa.String(length=64), nullable=False),
+    sa.Column('weather_snapshot_id', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id'),
+    sa.UniqueConstraint('date', 'item', name='uix_forecast_date_item')
+    )
+    op.create_index(op.f('ix_forecast_date'), 'forecast', ['date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_forecast_date'), table_name='forecast')
+    op.drop_table('forecast')
@@ -0,0 +1,50 @@
+"""add_campaign_job_table
+
+Revision ID: 5c1d8e3a7f20
+Revises: 4b7e2f9c1a3d
+Create Date: 2026-10-17 11:05:12.604931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c1d8e3a7f20'
+down_revision: Union[str, None] = '4b7e2f9c1a3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('campaignjob',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('campaign_id', sa.String(length=32), nullable=False),
+    sa.Column('restaurant_id', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('failed', sa.Integer(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaign.id'], ),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurant.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index(op.f('ix_campaignjob_campaign_id'), 'campaignjob', ['campaign_id'], unique=True)
+    op.create_index(op.f('ix_campaignjob_restaurant_id'), 'campaignjob', ['restaurant_id'], unique=False)
+    op.create_index(op.f('ix_campaignjob_status'), 'campaignjob', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_campaignjob_status'), table_name='campaignjob')
+    op.drop_index(op.f('ix_campaignjob_restaurant_id'), table_name='campaignjob')
+    op.drop_index(op.f('ix_campaignjob_campaign_id'), table_name='campaignjob')
+    op.drop_table('campaignjob')
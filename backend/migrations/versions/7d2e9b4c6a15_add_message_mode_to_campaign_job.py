@@ -0,0 +1,32 @@
+"""add_message_mode_to_campaign_job
+
+Revision ID: 7d2e9b4c6a15
+Revises: 5c1d8e3a7f20
+Create Date: 2026-10-17 14:28:37.190552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e9b4c6a15'
+down_revision: Union[str, None] = '5c1d8e3a7f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Jobs queued before this migration keep generating one message per customer
+    op.add_column('campaignjob', sa.Column('message_mode', sa.String(length=20), nullable=False,
+                                           server_default='per_customer'))
+    op.add_column('campaignjob', sa.Column('message_template', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('campaignjob', 'message_template')
+    op.drop_column('campaignjob', 'message_mode')
@@ -0,0 +1,45 @@
+"""add_campaign_recipient_table
+
+Revision ID: 8e4f1a6b2d37
+Revises: 7d2e9b4c6a15
+Create Date: 2026-10-17 16:42:09.318274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f1a6b2d37'
+down_revision: Union[str, None] = '7d2e9b4c6a15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('campaignrecipient',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('campaign_id', sa.String(length=32), nullable=False),
+    sa.Column('customer_id', sa.String(length=32), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaign.id'], ),
+    sa.ForeignKeyConstraint(['customer_id'], ['customer.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('campaign_id', 'customer_id', name='uix_campaign_recipient'),
+    sa.UniqueConstraint('id')
+    )
+    op.create_index('ix_campaignrecipient_campaign_id_status', 'campaignrecipient', ['campaign_id', 'status'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_campaignrecipient_campaign_id_status', table_name='campaignrecipient')
+    op.drop_table('campaignrecipient')
@@ -0,0 +1,28 @@
+"""add_data_version_to_restaurant
+
+Revision ID: 9a3c5e7f1b48
+Revises: 8e4f1a6b2d37
+Create Date: 2026-10-17 18:12:44.507316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3c5e7f1b48'
+down_revision: Union[str, None] = '8e4f1a6b2d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('restaurant', sa.Column('data_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('restaurant', 'data_version')
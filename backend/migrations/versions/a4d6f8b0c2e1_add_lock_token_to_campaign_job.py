@@ -0,0 +1,28 @@
+"""add_lock_token_to_campaign_job
+
+Revision ID: a4d6f8b0c2e1
+Revises: 9a3c5e7f1b48
+Create Date: 2026-10-17 19:03:26.884120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d6f8b0c2e1'
+down_revision: Union[str, None] = '9a3c5e7f1b48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('campaignjob', sa.Column('lock_token', sa.String(length=32), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('campaignjob', 'lock_token')
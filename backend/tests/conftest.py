@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Run from anywhere, like the benchmarks: app and benchmarks are imported from the backend directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
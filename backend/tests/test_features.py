@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from app.api.api_v1.endpoints.forecast import predict_sales
+from app.services.features import WEATHER_DESCRIPTION_PREFIX, WEATHER_DESCRIPTIONS, FeatureSchema
+from app.services.model_registry import model_registry, FOOD_ITEMS
+from benchmarks.feature_builder import legacy_features, legacy_pipeline
+
+# One day per weather description, in WEATHER_DESCRIPTIONS order, across a month boundary
+WEATHER = {
+    "daily": {
+        "time": ["2025-01-29", "2025-01-30", "2025-01-31", "2025-02-01", "2025-02-02", "2025-02-03", "2025-02-04"],
+        "temperature_2m_mean": [4.2, 6.0, -1.5, -3.4, 21.7, 14.3, 9.9],
+        "sunshine_duration": [0.0, 5000.0, 0.0, 12000.0, 40000.0, 20000.0, 5000.0],
+        "rain_sum": [8.0, 2.5, 0.0, 0.0, 0.0, 0.0, 0.0],
+        "snowfall_sum": [0.0, 0.0, 1.4, 0.0, 0.0, 0.0, 0.0],
+    }
+}
+
+MODELS = model_registry.get_models()
+
+
+@pytest.fixture
+def schema():
+    return FeatureSchema.from_models(MODELS)
+
+
+def test_features_match_pandas_frame(schema):
+    features = schema.build(WEATHER)
+    legacy = legacy_features(WEATHER, MODELS)
+
+    assert np.array_equal(features.dates, legacy["Date"].to_numpy().astype("datetime64[D]"))
+    assert np.array_equal(features.X, legacy[schema.feature_names].to_numpy(dtype=float))
+
+
+def test_predictions_match_pandas_pipeline(schema):
+    predictions = predict_sales(schema.build(WEATHER), MODELS)
+    legacy = legacy_pipeline(WEATHER, MODELS)
+
+    for item in FOOD_ITEMS:
+        assert np.array_equal(predictions[item].to_numpy(), legacy[item].to_numpy()), item
+
+
+def test_compiled_predictions_match_pandas_pipeline():
+    predictors = model_registry.get_predictors()
+    predictions = predict_sales(FeatureSchema.from_models(predictors).build(WEATHER), predictors)
+    legacy = legacy_pipeline(WEATHER, MODELS)
+
+    for item in FOOD_ITEMS:
+        assert np.allclose(predictions[item].to_numpy(), legacy[item].to_numpy()), item
+
+
+def test_every_weather_description_occurs():
+    legacy = legacy_features(WEATHER, MODELS)
+
+    for description in WEATHER_DESCRIPTIONS:
+        assert legacy[f"{WEATHER_DESCRIPTION_PREFIX}{description}"].sum() == 1, description
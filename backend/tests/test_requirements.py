@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from app.api.api_v1.endpoints.inventory_forecast import build_inventory_summary
+from app.services.recipes import RecipeIndex
+from app.services.requirements import compute_requirements
+from benchmarks.inventory_requirements import legacy_requirements, legacy_summary, synthetic_data
+
+# The loops had no day-by-day timeline, see benchmarks.stockout_timeline
+TIMELINE = {"stockout_date", "daily_balances"}
+EXCLUDE = {"shortages": {"__all__": TIMELINE}, "excesses": {"__all__": TIMELINE}}
+
+
+@pytest.fixture(params=[False, True], ids=["whole", "fractional"])
+def data(request):
+    return synthetic_data(50, 300, 7, 20, request.param, np.random.default_rng(0))
+
+
+def test_requirements_match_dict_loops(data):
+    recipes, menu_keys, forecast_df, _ = data
+    requirements = compute_requirements(RecipeIndex(recipes), menu_keys, forecast_df[menu_keys].to_numpy())
+    legacy = legacy_requirements(forecast_df, recipes, menu_keys)
+
+    assert requirements.ingredients == list(legacy)
+    assert requirements.units == [required["unit"] for required in legacy.values()]
+    assert requirements.menu_names == [required["menu_items"] for required in legacy.values()]
+    assert requirements.amounts.tolist() == [required["amount"] for required in legacy.values()]
+
+
+def test_summary_matches_dict_loops(data):
+    recipes, menu_keys, forecast_df, current_inventory = data
+    summary = build_inventory_summary(forecast_df, RecipeIndex(recipes), current_inventory, menu_keys)
+    legacy = legacy_summary(forecast_df, recipes, current_inventory, menu_keys)
+
+    assert summary.shortages and summary.excesses
+    assert summary.model_dump(exclude=EXCLUDE) == legacy.model_dump(exclude=EXCLUDE)
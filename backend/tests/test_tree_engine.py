@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from app.services.model_registry import model_registry
+from app.services.tree_engine import CompiledGradientBoosting
+from benchmarks.tree_inference import random_rows
+
+MODELS = model_registry.get_models()
+
+
+@pytest.mark.parametrize("name", list(MODELS))
+@pytest.mark.parametrize("n_rows", [1, 7, 16, 1000])
+def test_compiled_model_matches_sklearn(name, n_rows):
+    model = MODELS[name]
+    X = random_rows(model, n_rows, np.random.default_rng(n_rows))
+
+    assert np.allclose(CompiledGradientBoosting(model).predict(X), model.predict(X))
+
+
+@pytest.mark.parametrize("name", list(MODELS))
+def test_compiled_model_matches_sklearn_on_arrays(name):
+    model = MODELS[name]
+    X = random_rows(model, 7, np.random.default_rng(0))
+
+    assert np.allclose(CompiledGradientBoosting(model).predict(X.to_numpy()), model.predict(X))
+
+
+def test_every_model_is_registered():
+    assert MODELS, "no forecast model could be loaded"
@@ -61,8 +61,8 @@ type CampaignResponse = {
   name: string;
   message: string;
   already_exists?: boolean;
-  success_count?: number;
-  failed_count?: number;
+  job_id?: string;
+  status?: string;
   total_messages?: number;
 };
 